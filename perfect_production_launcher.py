@@ -34,6 +34,13 @@ import subprocess
 # Import our perfect bot
 from perfect_telegram_bot import PerfectTelegramRevenueCopilot
 
+# Environment the launcher validates - fixed at import, not rebuilt per check
+REQUIRED_ENV_VARS = ('TELEGRAM_BOT_TOKEN',)
+OPTIONAL_ENV_VARS = {
+    'OPENAI_API_KEY': 'OpenAI integration',
+    'GOOGLE_CREDENTIALS_PATH': 'Google APIs integration'
+}
+
 
 class ProductionLauncher:
     """
@@ -113,27 +120,16 @@ class ProductionLauncher:
         logger.info("🔍 Validating production environment...")
         
         # Check required environment variables
-        required_env_vars = [
-            'TELEGRAM_BOT_TOKEN'
-        ]
-        
-        missing_vars = []
-        for var in required_env_vars:
-            if not os.getenv(var):
-                missing_vars.append(var)
+        env = os.environ
+        missing_vars = [var for var in REQUIRED_ENV_VARS if not env.get(var)]
         
         if missing_vars:
             logger.warning(f"⚠️  Missing environment variables: {missing_vars}")
             logger.info("💡 Using fallback values for demonstration...")
         
         # Check optional environment variables
-        optional_vars = {
-            'OPENAI_API_KEY': 'OpenAI integration',
-            'GOOGLE_CREDENTIALS_PATH': 'Google APIs integration'
-        }
-        
-        for var, description in optional_vars.items():
-            if os.getenv(var):
+        for var, description in OPTIONAL_ENV_VARS.items():
+            if env.get(var):
                 logger.info(f"✅ {description} available")
             else:
                 logger.warning(f"⚠️  {description} not configured - using fallback")
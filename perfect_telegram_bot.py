@@ -18,7 +18,6 @@ This bot will get you the job! 💪
 
 import os
 import sys
-import json
 import logging
 import asyncio
 import hashlib
@@ -27,11 +26,15 @@ import tempfile
 import sqlite3
 import re
 import time
+import queue
+import importlib.util
+from functools import lru_cache
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, Future
 import threading
 from contextlib import asynccontextmanager
 
@@ -40,6 +43,28 @@ import requests
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, Document, PhotoSize
 from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, ContextTypes, filters
 
+# Bot API rate limiting (optional - python-telegram-bot[rate-limiter])
+try:
+    from aiolimiter import AsyncLimiter
+    from telegram.ext import AIORateLimiter
+    RATE_LIMITER_AVAILABLE = True
+except ImportError:
+    RATE_LIMITER_AVAILABLE = False
+
+# libuv event loop (optional - uvloop)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# HTTP/2 for the Bot API client (optional - httpx[http2])
+try:
+    import h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # Core Pydantic for type safety (required for client satisfaction)
 try:
     from pydantic import BaseModel, Field
@@ -51,6 +76,10 @@ except ImportError:
         def __init__(self, **kwargs):
             for key, value in kwargs.items():
                 setattr(self, key, value)
+        
+        @classmethod
+        def model_construct(cls, **kwargs):
+            return cls(**kwargs)
     
     def Field(**kwargs):
         return None
@@ -67,6 +96,27 @@ try:
 except ImportError:
     LANGCHAIN_AVAILABLE = False
 
+# Local embeddings fallback (optional - needs sentence-transformers at runtime)
+try:
+    from langchain.embeddings import HuggingFaceEmbeddings
+    HF_EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    HF_EMBEDDINGS_AVAILABLE = False
+
+# ONNX Runtime MiniLM for CPU-only hosts (optional - optimum[onnxruntime])
+# Only probed here - transformers/optimum are heavy, imported when the embedder is built
+ONNX_EMBEDDINGS_AVAILABLE = all(
+    importlib.util.find_spec(module) is not None
+    for module in ("numpy", "onnxruntime", "optimum", "transformers")
+)
+
+# Chroma client for server mode (optional - falls back to the embedded persistent store)
+try:
+    import chromadb
+    CHROMADB_AVAILABLE = True
+except ImportError:
+    CHROMADB_AVAILABLE = False
+
 # Google APIs (required for client satisfaction)
 try:
     from googleapiclient.discovery import build
@@ -79,7 +129,7 @@ except ImportError:
 
 # Configure logging for production
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),  # WARNING in production skips per-message log formatting
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
         logging.FileHandler('perfect_telegram_bot.log'),
@@ -95,6 +145,7 @@ class IntentClassification(BaseModel):
     entities: Dict[str, Any] = Field(default_factory=dict, description="Extracted entities")
     confidence: float = Field(..., ge=0.0, le=1.0, description="Classification confidence")
     requestId: str = Field(..., description="Request ID for observability")
+    secondaryIntent: Optional[str] = Field(None, description="Runner-up intent that also matched, if any")
 
 class Citation(BaseModel):
     """Citation model matching client requirements"""
@@ -132,6 +183,249 @@ class ScheduleInfo(BaseModel):
     endISO: Optional[str] = None
     attendees: Optional[List[str]] = None
 
+# Embedding helpers for the Chroma knowledge base
+_BATCHER_STOP = object()
+
+class BatchedQueryEmbeddings:
+    """Coalesces concurrent embed_query calls into a single embed_documents batch
+
+    Questions arriving within max_wait seconds of each other (up to max_batch)
+    share one model forward pass / API request instead of one each.
+    """
+
+    def __init__(self, base_embeddings, max_batch: int = 32, max_wait: float = 0.01, result_timeout: float = 30.0):
+        self.base = base_embeddings
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.result_timeout = result_timeout
+        self._pending: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        # Guards _closed + put so nothing is queued behind the stop sentinel
+        self._lock = threading.Lock()
+        self._closed = False
+        self._worker = threading.Thread(target=self._batch_worker, name="embed-batcher", daemon=True)
+        self._worker.start()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BatchedQueryEmbeddings is closed")
+            self._pending.put((text, future))
+        # Bounded wait - a dead worker must not pin executor threads forever
+        return future.result(timeout=self.result_timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush queued questions and stop the batching thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._pending.put(_BATCHER_STOP)
+        self._worker.join(timeout)
+
+    def _batch_worker(self):
+        stopping = False
+        while not stopping:
+            item = self._pending.get()
+            if item is _BATCHER_STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _BATCHER_STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                vectors = self.base.embed_documents([text for text, _ in batch])
+                if len(vectors) != len(batch):
+                    raise RuntimeError(f"embed_documents returned {len(vectors)} vectors for {len(batch)} texts")
+                for (_, future), vector in zip(batch, vectors):
+                    future.set_result(vector)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+        
+        # Anything still queued after the sentinel would otherwise wait forever
+        while True:
+            try:
+                _, future = self._pending.get_nowait()
+            except queue.Empty:
+                return
+            future.set_exception(RuntimeError("closed"))
+
+class CachedQueryEmbeddings:
+    """Embeddings wrapper that memoizes embed_query, keyed on the normalized question
+
+    The cache key is lowercased/whitespace-collapsed, but the model always sees the
+    original text - embeddings are case-sensitive and long questions must not be cut.
+    """
+
+    def __init__(self, base_embeddings, maxsize: int = 4096):
+        self.base = base_embeddings
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = " ".join(text.lower().split())
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+                return list(vector)
+
+        vector = tuple(self.base.embed_query(text))
+        with self._lock:
+            self._cache[key] = vector
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return list(vector)
+
+class OnnxMiniLMEmbeddings:
+    """MiniLM exported to ONNX Runtime with int8 dynamic quantization for CPU inference"""
+
+    MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+    def __init__(self, export_dir: str = "./data/onnx-minilm", num_threads: int = 4, batch_size: int = 64):
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+        
+        self.batch_size = batch_size
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = num_threads
+        
+        quantized_path = Path(export_dir) / "model_quantized.onnx"
+        if not quantized_path.exists():
+            # One-off export + quantization, reused on every later start
+            model = ORTModelForFeatureExtraction.from_pretrained(self.MODEL_NAME, export=True)
+            quantizer = ORTQuantizer.from_pretrained(model)
+            quantizer.quantize(
+                save_dir=export_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            )
+            AutoTokenizer.from_pretrained(self.MODEL_NAME).save_pretrained(export_dir)
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            export_dir, file_name=quantized_path.name, session_options=session_options
+        )
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        import numpy as np
+        
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            encoded = self.tokenizer(
+                texts[start:start + self.batch_size],
+                padding=True, truncation=True, max_length=256, return_tensors="np"
+            )
+            hidden = self.model(**encoded).last_hidden_state
+            # Mean pooling over real tokens, then L2 normalize (matches sentence-transformers)
+            mask = encoded["attention_mask"][..., None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-9, None)
+            vectors.extend(pooled.tolist())
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0]
+
+# HNSW graph tuned for large corpora - only valid for a collection built with these settings
+KNOWLEDGE_COLLECTION = "knowledge_base"
+KNOWLEDGE_COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:construction_ef": 200,
+    "hnsw:M": 32,
+    "hnsw:search_ef": 64,
+    "hnsw:num_threads": os.cpu_count() or 1
+}
+
+def _new_collection_metadata(client, name: str) -> Optional[Dict[str, Any]]:
+    """HNSW metadata for a collection that doesn't exist yet, None for an existing one
+
+    get_or_create_collection overwrites the stored metadata of an existing collection,
+    which would relabel an L2-built index as cosine and skew its relevance scores.
+    """
+    existing = {getattr(collection, 'name', collection) for collection in client.list_collections()}
+    return None if name in existing else KNOWLEDGE_COLLECTION_METADATA
+
+@lru_cache(maxsize=1)
+def _load_local_embeddings():
+    """Local MiniLM embeddings - loaded once per process, kept on CUDA when available and warmed up"""
+    try:
+        import torch
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        device = "cpu"
+    
+    if device == "cpu" and ONNX_EMBEDDINGS_AVAILABLE:
+        # No GPU: the quantized ONNX Runtime model beats the PyTorch CPU path
+        embeddings = OnnxMiniLMEmbeddings()
+        embeddings.embed_query("warmup")
+        logger.info("✅ Using local MiniLM embeddings on ONNX Runtime (int8)")
+        return embeddings
+    
+    embeddings = HuggingFaceEmbeddings(
+        model_name="sentence-transformers/all-MiniLM-L6-v2",
+        model_kwargs={"device": device},
+        encode_kwargs={"batch_size": 128, "normalize_embeddings": True}
+    )
+    # First encode pays model load/transfer - do it now, not on a user's question
+    embeddings.embed_query("warmup")
+    logger.info("✅ Using local MiniLM embeddings on %s", device)
+    return embeddings
+
+# Static reply templates - built once at import, not per message
+KNOWLEDGE_SEARCHING_TEXT = "🔍 **Searching the knowledge base...**\n\nAgent A is finding grounded answers..."
+SMALLTALK_RESPONSES = {
+    'greeting': "🚀 **Hello!** I'm your Perfect Revenue Copilot with dual LangGraph agents. Ready to capture leads and answer questions!",
+    'thanks': "✨ **You're welcome!** Happy to help with your revenue growth! Upload documents, capture leads, or ask anything.",
+    'capabilities': "🎯 **I can help with:**\n• Document Q&A with citations (Agent A)\n• Lead capture & qualification (Agent B)\n• Proposal generation\n• Calendar scheduling\n• CRM management\n\nJust talk naturally - no commands needed!"
+}
+
+# Static inline keyboards - only the knowledge "View Sources" button varies per reply
+KNOWLEDGE_FOLLOWUP_ROWS = (
+    (InlineKeyboardButton("❓ Follow-up Question", callback_data="followup"),),
+    (InlineKeyboardButton("📅 Schedule Discussion", callback_data="schedule"),)
+)
+LEAD_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📊 Generate Proposal", callback_data="proposal")],
+    [InlineKeyboardButton("📅 Schedule Demo", callback_data="schedule")],
+    [InlineKeyboardButton("📝 View CRM", callback_data="crm")]
+])
+PROPOSAL_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📄 Open PDF", callback_data="pdf")],
+    [InlineKeyboardButton("✏️ Customize", callback_data="customize")],
+    [InlineKeyboardButton("📧 Send to Client", callback_data="send")]
+])
+SCHEDULE_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📅 Open Calendar", callback_data="calendar")],
+    [InlineKeyboardButton("✏️ Edit Event", callback_data="edit")],
+    [InlineKeyboardButton("❌ Cancel Event", callback_data="cancel")]
+])
+
 
 class PerfectTelegramRevenueCopilot:
     """
@@ -152,7 +446,14 @@ class PerfectTelegramRevenueCopilot:
     
     def __init__(self, bot_token: str):
         self.bot_token = bot_token
-        self.app = Application.builder().token(bot_token).build()
+        # Shared keep-alive Bot API client - HTTP/2 multiplexes concurrent replies on one connection
+        builder = Application.builder().token(bot_token).pool_timeout(5.0).post_init(self.warm_up).post_shutdown(self.shut_down)
+        if HTTP2_AVAILABLE:
+            builder = builder.http_version("2")
+        if RATE_LIMITER_AVAILABLE:
+            # Queue sends under Telegram's flood limits and retry 429s instead of failing replies
+            builder = builder.rate_limiter(AIORateLimiter(max_retries=3))
+        self.app = builder.build()
         
         # Client Requirements: Initialize all systems
         self.setup_database()
@@ -244,6 +545,7 @@ class PerfectTelegramRevenueCopilot:
     
     def setup_vector_store(self):
         """Setup Chroma vector database exactly as client specified"""
+        self.query_batcher = None
         try:
             # Client Requirements: Persistent Chroma volume
             Path("./data/chroma").mkdir(parents=True, exist_ok=True)
@@ -256,15 +558,43 @@ class PerfectTelegramRevenueCopilot:
                     logger.info("✅ Using OpenAI embeddings for production quality")
                 else:
                     # Client Requirements: Fallback embeddings
-                    logger.warning("⚠️  OpenAI API key not found - using basic embeddings")
                     self.embeddings = None
-                
+                    if HF_EMBEDDINGS_AVAILABLE or ONNX_EMBEDDINGS_AVAILABLE:
+                        try:
+                            self.embeddings = self.create_local_embeddings()
+                        except Exception as e:
+                            logger.warning("⚠️  Local embeddings unavailable: %s", e)
+                    if not self.embeddings:
+                        logger.warning("⚠️  OpenAI API key not found - using basic embeddings")
+
+                if self.embeddings:
+                    # Concurrent questions share one embedding batch; repeated ones skip it entirely
+                    self.query_batcher = BatchedQueryEmbeddings(self.embeddings)
+                    self.embeddings = CachedQueryEmbeddings(self.query_batcher)
+
                 # Client Requirements: Persistent Chroma vector store
                 if self.embeddings:
+                    chroma_target = {"persist_directory": "./data/chroma"}
+                    collection_metadata = None
+                    if CHROMADB_AVAILABLE:
+                        chroma_host = os.getenv('CHROMA_HOST')
+                        if chroma_host:
+                            # Server mode: indexing/persistence happen in the `chroma run` process
+                            client = chromadb.HttpClient(
+                                host=chroma_host, port=int(os.getenv('CHROMA_PORT', '8000'))
+                            )
+                            logger.info("✅ Using Chroma server at %s", chroma_host)
+                        else:
+                            client = chromadb.PersistentClient(path="./data/chroma")
+                        chroma_target = {"client": client}
+                        # Tuned HNSW settings only for a fresh collection - existing ones keep theirs
+                        collection_metadata = _new_collection_metadata(client, KNOWLEDGE_COLLECTION)
+                    
                     self.vector_store = Chroma(
-                        persist_directory="./data/chroma",
+                        **chroma_target,
                         embedding_function=self.embeddings,
-                        collection_name="knowledge_base"
+                        collection_name=KNOWLEDGE_COLLECTION,
+                        collection_metadata=collection_metadata
                     )
                     logger.info("✅ Chroma vector database initialized with persistence")
                 else:
@@ -276,10 +606,14 @@ class PerfectTelegramRevenueCopilot:
                 logger.warning("⚠️  LangChain not available - using basic search")
                 
         except Exception as e:
-            logger.error(f"❌ Vector store setup failed: {e}")
+            logger.error("❌ Vector store setup failed: %s", e)
             self.vector_store = None
             self.embeddings = None
     
+    def create_local_embeddings(self):
+        """Local MiniLM embeddings - shared by every bot in the process"""
+        return _load_local_embeddings()
+    
     def setup_google_services(self):
         """Setup Google APIs exactly as client required"""
         try:
@@ -313,7 +647,7 @@ class PerfectTelegramRevenueCopilot:
                 logger.warning("⚠️  Google APIs not available")
                 
         except Exception as e:
-            logger.error(f"❌ Google services setup failed: {e}")
+            logger.error("❌ Google services setup failed: %s", e)
             self.drive_service = None
             self.sheets_service = None
             self.calendar_service = None
@@ -325,8 +659,41 @@ class PerfectTelegramRevenueCopilot:
         self.agent_b = DealflowAgent(self)   # LangGraph Dealflow Agent
         self.intent_classifier = IntentClassifier(self)  # Shared mini-graph
         
+        # ⚡ Intent -> route lookup, built once instead of an if/elif chain per message
+        self.intent_routes = {
+            'knowledge_qa': self.route_knowledge_qa,
+            'lead_capture': self.route_lead_capture,
+            'proposal_request': self.route_proposal_request,
+            'next_step': self.route_next_step,
+            'status_update': self.route_status_update
+        }
+        
         logger.info("✅ LangGraph agents initialized (Agent A: Knowledge, Agent B: Dealflow)")
     
+    async def warm_up(self, application: Application):
+        """post_init hook - pay first-call costs before polling starts, not on the first user message"""
+        started = time.perf_counter()
+        sample = "Sarah from Acme wants a demo next Tuesday at 3pm, budget $20k"
+        
+        # Regex/classifier paths and their lazily-built caches
+        await self.intent_classifier.classify_intent(sample, [], "warmup")
+        self.agent_b.parse_lead_text(sample)
+        await self.agent_b.nextstep_parse(sample, "warmup")
+        await self.agent_b.status_classify("deal won", "warmup")
+        
+        # Open the sqlite file once so the first write doesn't pay for it
+        await asyncio.get_running_loop().run_in_executor(
+            self.executor, lambda: sqlite3.connect(self.db_path).close()
+        )
+        
+        logger.info("🔥 Warm-up finished in %.1fms", (time.perf_counter() - started) * 1000)
+    
+    async def shut_down(self, application: Application):
+        """post_shutdown hook - answer queued embedding queries and stop the batcher thread"""
+        if self.query_batcher:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self.query_batcher.close)
+            logger.info("✅ Embedding batcher stopped")
+    
     def setup_handlers(self):
         """Setup handlers for natural language processing (NO COMMANDS as client requested)"""
         # Client Requirements: Natural language only - no slash commands
@@ -444,54 +811,87 @@ Ready to 10x your revenue! 🎯"""
             })
             
             # Client Requirements: Route to appropriate LangGraph agent
-            if intent_result.intent == 'knowledge_qa':
-                # Agent A (Knowledge) - LangGraph
-                response = await self.agent_a.ask(user.id, text, request_id)
-                await self.send_knowledge_response(update, response)
-                self.metrics['qa_responses'] += 1
-                
-            elif intent_result.intent == 'lead_capture':
-                # Agent B (Dealflow) - LangGraph
-                lead = await self.agent_b.newlead(text, request_id)
-                await self.send_lead_confirmation(update, lead)
-                self.user_sessions[user.id]['last_lead'] = lead
-                self.metrics['leads_captured'] += 1
-                
-            elif intent_result.intent == 'proposal_request':
-                # Agent B (Dealflow) - LangGraph
-                last_lead = self.user_sessions[user.id]['last_lead']
-                proposal = await self.agent_b.proposal_copy(last_lead, request_id)
-                await self.send_proposal_response(update, proposal)
-                self.metrics['proposals_generated'] += 1
-                
-            elif intent_result.intent == 'next_step':
-                # Agent B (Dealflow) - LangGraph
-                schedule_info = await self.agent_b.nextstep_parse(text, request_id)
-                await self.handle_scheduling(update, schedule_info)
-                self.metrics['events_scheduled'] += 1
-                
-            elif intent_result.intent == 'status_update':
-                # Agent B (Dealflow) - LangGraph
-                await self.agent_b.status_classify(text, request_id)
-                await update.message.reply_text(
-                    "✅ **Status Updated Successfully!**\n\nCRM has been synced with new status.",
-                    parse_mode='Markdown'
-                )
-                
-            else:  # smalltalk or unknown
-                response = await self.handle_smalltalk(text, intent_result)
-                await update.message.reply_text(response, parse_mode='Markdown')
+            if (intent_result.intent in ('knowledge_qa', 'next_step')
+                    and 'knowledge_qa' in (intent_result.intent, intent_result.secondaryIntent)
+                    and _SCHEDULE_REQUEST_RE.search(text)):
+                # Question plus an explicit "schedule a call" - answer and book together
+                route = self.route_knowledge_and_schedule
+            else:
+                route = self.intent_routes.get(intent_result.intent, self.route_smalltalk)
+            await route(update, text, request_id, intent_result)
             
             # Client Requirements: Log to Conversations sheet
             await self.log_conversation(user, intent_result, text, request_id)
             
         except Exception as e:
-            logger.error(f"❌ Error processing message: {e}")
+            logger.error("❌ Error processing message: %s", e)
             await update.message.reply_text(
                 "⚠️ I encountered an error. Let me get that fixed right away!",
                 parse_mode='Markdown'
             )
     
+    async def route_knowledge_and_schedule(self, update: Update, text: str, request_id: str, intent_result: IntentClassification):
+        """Ambiguous request - run Agent A Q&A and Agent B scheduling concurrently"""
+        placeholder, response, schedule_info = await asyncio.gather(
+            update.message.reply_text(KNOWLEDGE_SEARCHING_TEXT, parse_mode='Markdown'),
+            self.agent_a.ask(update.effective_user.id, text, request_id),
+            self.agent_b.nextstep_parse(text, request_id)
+        )
+        await self.send_knowledge_response(update, response, placeholder)
+        await self.handle_scheduling(update, schedule_info)
+        self.metrics['qa_responses'] += 1
+        self.metrics['events_scheduled'] += 1
+    
+    async def route_knowledge_qa(self, update: Update, text: str, request_id: str, intent_result: IntentClassification):
+        """Agent A (Knowledge) - LangGraph"""
+        # Acknowledge immediately while retrieval runs, then edit in the answer
+        placeholder, response = await asyncio.gather(
+            update.message.reply_text(KNOWLEDGE_SEARCHING_TEXT, parse_mode='Markdown'),
+            self.agent_a.ask(update.effective_user.id, text, request_id)
+        )
+        await self.send_knowledge_response(update, response, placeholder)
+        self.metrics['qa_responses'] += 1
+    
+    async def route_lead_capture(self, update: Update, text: str, request_id: str, intent_result: IntentClassification):
+        """Agent B (Dealflow) - LangGraph"""
+        lead = await self.agent_b.newlead(text, request_id, persist=False)
+        # CRM write and user confirmation don't depend on each other - run them together
+        await asyncio.gather(
+            self.agent_b.save_to_crm(lead, request_id),
+            self.send_lead_confirmation(update, lead)
+        )
+        self.user_sessions[update.effective_user.id]['last_lead'] = lead
+        self.metrics['leads_captured'] += 1
+    
+    async def route_proposal_request(self, update: Update, text: str, request_id: str, intent_result: IntentClassification):
+        """Agent B (Dealflow) - LangGraph"""
+        last_lead = self.user_sessions[update.effective_user.id]['last_lead']
+        proposal = await self.agent_b.proposal_copy(last_lead, request_id)
+        await self.send_proposal_response(update, proposal)
+        self.metrics['proposals_generated'] += 1
+    
+    async def route_next_step(self, update: Update, text: str, request_id: str, intent_result: IntentClassification):
+        """Agent B (Dealflow) - LangGraph"""
+        schedule_info = await self.agent_b.nextstep_parse(text, request_id)
+        await self.handle_scheduling(update, schedule_info)
+        self.metrics['events_scheduled'] += 1
+    
+    async def route_status_update(self, update: Update, text: str, request_id: str, intent_result: IntentClassification):
+        """Agent B (Dealflow) - LangGraph"""
+        status = await self.agent_b.status_classify(text, request_id)
+        await update.message.reply_text(
+            f"✅ **Status Updated Successfully!**\n\n"
+            f"📊 **Status:** {status['status']}\n"
+            f"🏷️ **Reason:** {status['reasonCategory']}\n\n"
+            f"CRM has been synced with new status.",
+            parse_mode='Markdown'
+        )
+    
+    async def route_smalltalk(self, update: Update, text: str, request_id: str, intent_result: IntentClassification):
+        """Smalltalk or unknown intent"""
+        response = await self.handle_smalltalk(text, intent_result)
+        await update.message.reply_text(response, parse_mode='Markdown')
+    
     async def handle_file_ingestion(self, update: Update, context: ContextTypes.DEFAULT_TYPE, request_id: str):
         """Client Requirements: File ingestion exactly as specified"""
         user = update.effective_user
@@ -536,14 +936,14 @@ Ready to 10x your revenue! 🎯"""
                 os.remove(file_path)
                 
         except Exception as e:
-            logger.error(f"❌ File ingestion error: {e}")
+            logger.error("❌ File ingestion error: %s", e)
             await processing_msg.edit_text(
                 "⚠️ File processing failed. Please try a different format.",
                 parse_mode='Markdown'
             )
     
-    async def send_knowledge_response(self, update: Update, response: KnowledgeResponse):
-        """Client Requirements: Send knowledge response with citations"""
+    async def send_knowledge_response(self, update: Update, response: KnowledgeResponse, placeholder=None):
+        """Client Requirements: Send knowledge response with citations (edits placeholder if given)"""
         text = f"📚 **Grounded Answer from Knowledge Base**\n\n{response.answer}"
         
         if response.citations:
@@ -556,14 +956,15 @@ Ready to 10x your revenue! 🎯"""
         text += f"\n\n🎯 **Confidence:** {response.confidence:.1%}"
         text += f"\n🔍 **Request ID:** `{response.requestId}`"
         
-        keyboard = [
-            [InlineKeyboardButton("📄 View Sources", callback_data=f"sources_{response.requestId}")],
-            [InlineKeyboardButton("❓ Follow-up Question", callback_data="followup")],
-            [InlineKeyboardButton("📅 Schedule Discussion", callback_data="schedule")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = InlineKeyboardMarkup((
+            (InlineKeyboardButton("📄 View Sources", callback_data=f"sources_{response.requestId}"),),
+            *KNOWLEDGE_FOLLOWUP_ROWS
+        ))
         
-        await update.message.reply_text(text, reply_markup=reply_markup, parse_mode='Markdown')
+        if placeholder:
+            await placeholder.edit_text(text, reply_markup=reply_markup, parse_mode='Markdown')
+        else:
+            await update.message.reply_text(text, reply_markup=reply_markup, parse_mode='Markdown')
     
     async def send_lead_confirmation(self, update: Update, lead: Lead):
         """Client Requirements: Lead capture confirmation with CRM link"""
@@ -580,14 +981,7 @@ Ready to 10x your revenue! 🎯"""
 
 Our team will contact you within 2 hours!"""
         
-        keyboard = [
-            [InlineKeyboardButton("📊 Generate Proposal", callback_data=f"proposal")],
-            [InlineKeyboardButton("📅 Schedule Demo", callback_data=f"schedule")],
-            [InlineKeyboardButton("📝 View CRM", callback_data=f"crm")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(text, reply_markup=reply_markup, parse_mode='Markdown')
+        await update.message.reply_text(text, reply_markup=LEAD_KEYBOARD, parse_mode='Markdown')
     
     async def send_proposal_response(self, update: Update, proposal: ProposalContent):
         """Client Requirements: Proposal generation with Drive PDF link"""
@@ -604,14 +998,7 @@ Our team will contact you within 2 hours!"""
         
         text += "\n\n🔗 **Drive PDF Link:** [View Full Proposal](#drive-link)"
         
-        keyboard = [
-            [InlineKeyboardButton("📄 Open PDF", callback_data=f"pdf")],
-            [InlineKeyboardButton("✏️ Customize", callback_data=f"customize")],
-            [InlineKeyboardButton("📧 Send to Client", callback_data=f"send")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(text, reply_markup=reply_markup, parse_mode='Markdown')
+        await update.message.reply_text(text, reply_markup=PROPOSAL_KEYBOARD, parse_mode='Markdown')
     
     async def handle_scheduling(self, update: Update, schedule_info: ScheduleInfo):
         """Client Requirements: Calendar event creation with confirmation"""
@@ -627,30 +1014,17 @@ Our team will contact you within 2 hours!"""
         if schedule_info.attendees:
             text += f"\n👥 **Attendees:** {', '.join(schedule_info.attendees)}"
         
-        keyboard = [
-            [InlineKeyboardButton("📅 Open Calendar", callback_data="calendar")],
-            [InlineKeyboardButton("✏️ Edit Event", callback_data=f"edit")],
-            [InlineKeyboardButton("❌ Cancel Event", callback_data=f"cancel")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(text, reply_markup=reply_markup, parse_mode='Markdown')
+        await update.message.reply_text(text, reply_markup=SCHEDULE_KEYBOARD, parse_mode='Markdown')
     
     async def handle_smalltalk(self, text: str, intent_result: IntentClassification) -> str:
         """Handle casual conversation"""
-        responses = {
-            'greeting': "🚀 **Hello!** I'm your Perfect Revenue Copilot with dual LangGraph agents. Ready to capture leads and answer questions!",
-            'thanks': "✨ **You're welcome!** Happy to help with your revenue growth! Upload documents, capture leads, or ask anything.",
-            'capabilities': "🎯 **I can help with:**\n• Document Q&A with citations (Agent A)\n• Lead capture & qualification (Agent B)\n• Proposal generation\n• Calendar scheduling\n• CRM management\n\nJust talk naturally - no commands needed!"
-        }
-        
         text_lower = text.lower()
         if any(word in text_lower for word in ['hello', 'hi', 'hey']):
-            return responses['greeting']
+            return SMALLTALK_RESPONSES['greeting']
         elif any(word in text_lower for word in ['thanks', 'thank you']):
-            return responses['thanks']
+            return SMALLTALK_RESPONSES['thanks']
         elif any(word in text_lower for word in ['help', 'what can you do']):
-            return responses['capabilities']
+            return SMALLTALK_RESPONSES['capabilities']
         else:
             return "🤖 **I understand!** Try uploading a document, capturing a lead, or asking a question. My dual agents are ready to help!"
     
@@ -713,28 +1087,34 @@ Our team will contact you within 2 hours!"""
     
     async def log_conversation(self, user, intent_result: IntentClassification, input_text: str, request_id: str):
         """Client Requirements: Log to Conversations sheet"""
+        row = (
+            datetime.now().isoformat(),
+            str(user.id),
+            intent_result.intent,
+            input_text,
+            intent_result.confidence,
+            request_id
+        )
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            # ⚡ sqlite connect/commit blocks - keep it off the event loop
+            await asyncio.get_running_loop().run_in_executor(self.executor, self._write_conversation, row)
             
-            cursor.execute("""
+        except Exception as e:
+            logger.error("❌ Logging error: %s", e)
+    
+    def _write_conversation(self, row: Tuple) -> None:
+        """Insert one conversation row (runs in the worker pool)"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("""
                 INSERT INTO conversations 
                 (timestamp, user_id, intent, input_text, confidence, request_id)
                 VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                datetime.now().isoformat(),
-                str(user.id),
-                intent_result.intent,
-                input_text,
-                intent_result.confidence,
-                request_id
-            ))
-            
+            """, row)
             conn.commit()
+        finally:
             conn.close()
-            
-        except Exception as e:
-            logger.error(f"❌ Logging error: {e}")
     
     def run(self):
         """Start the perfect bot"""
@@ -759,7 +1139,121 @@ Our team will contact you within 2 hours!"""
 ╚══════════════════════════════════════════════════════════════╝
 """)
         
-        self.app.run_polling(poll_interval=1)
+        # Long polling already waits server-side; a poll_interval would only delay the next batch
+        self.app.run_polling(poll_interval=0.0)
+
+# Precompiled lead patterns shared by IntentClassifier and DealflowAgent
+# One alternation with named groups: a single scan finds both "<Name> from <Company>" and the budget
+_LEAD_ENTITY_RE = re.compile(
+    r'(?P<lead>\b(?P<name>[A-Z][a-z]+)\s+from\s+(?P<company>[A-Z]\w+))'
+    r'|\$?(?P<budget>\d[\d,]*k?)'
+)
+_NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9]')
+_ATTENDEE_RE = re.compile(r'\bwith\s+([A-Z][a-z]+)')
+
+def _scan_lead_fields(text: str) -> Dict[str, str]:
+    """First name/company and first budget in one pass over the text"""
+    fields = {}
+    for match in _LEAD_ENTITY_RE.finditer(text):
+        if match.lastgroup == 'lead':
+            if 'name' not in fields:
+                fields['name'] = match.group('name')
+                fields['company'] = match.group('company')
+        elif 'budget' not in fields:
+            fields['budget'] = match.group('budget')
+        if len(fields) == 3:
+            break
+    return fields
+
+@lru_cache(maxsize=4096)
+def _company_domain(company: str) -> str:
+    """Normalized company name -> guessed domain (repeat companies are a dict lookup)"""
+    return f"{_NON_ALNUM_RE.sub('', company)}.com"
+
+# Status update reasons - closed label set, so a keyword lookup replaces any model call
+_WORD_RE = re.compile(r'[a-z]+')
+_REASON_KEYWORDS = {
+    'budget': 'budget', 'funding': 'budget',
+    'price': 'price', 'pricing': 'price', 'expensive': 'price', 'cost': 'price', 'cheap': 'price', 'discount': 'price',
+    'feature': 'features', 'features': 'features', 'integration': 'features', 'missing': 'features',
+    'competitor': 'competition', 'competitors': 'competition', 'competition': 'competition',
+    'timeline': 'timeline', 'delayed': 'timeline', 'quarter': 'timeline', 'later': 'timeline', 'postponed': 'timeline',
+    'relationship': 'relationship', 'champion': 'relationship', 'trust': 'relationship'
+}
+
+# Precompiled scheduling patterns - case-insensitive, so no lowercased copy of the message is needed
+_TIME_RE = re.compile(r'\b(\d{1,2}):?(\d{2})?\s*(am|pm)?\b', re.IGNORECASE)
+_DAY_RE = re.compile(r'\b(tomorrow|next\s+\w+)\b', re.IGNORECASE)
+_DATE_RE = re.compile(
+    r'\b(today|tomorrow|(?:next\s+)?(monday|mon|tuesday|tues|tue|wednesday|wed|thursday|thurs|thur|thu'
+    r'|friday|fri|saturday|sat|sunday|sun))\b',
+    re.IGNORECASE
+)
+_MEETING_KIND_RE = re.compile(r'\b(demo|discovery|follow[- ]?up|proposal|review)\b', re.IGNORECASE)
+_WEEKDAYS = {'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6}
+_MEETING_TITLES = {
+    'demo': "Product Demo",
+    'discovery': "Discovery Call",
+    'followup': "Follow-up",
+    'proposal': "Proposal Review",
+    'review': "Review"
+}
+
+# Explicit scheduling request ("schedule a call", "book a demo") - a bare day or time is not enough
+_SCHEDULE_REQUEST_PATTERN = r'\b(schedule|book|set\s+up)\s+(?:an?\s+)?(meeting|call|demo)\b'
+_SCHEDULE_REQUEST_RE = re.compile(_SCHEDULE_REQUEST_PATTERN, re.IGNORECASE)
+
+# Client Requirements: 6 intent types exactly as specified
+_RAW_INTENT_PATTERNS = {
+    'knowledge_qa': [
+        r'\b(what|how|when|where|why|tell me|explain|question)\b',
+        r'\b(policy|procedure|document|refund|return)\b'
+    ],
+    'lead_capture': [
+        r'\b(\w+)\s+from\s+(\w+)\s+(wants|needs|interested)\b',
+        r'\b(budget|pricing)\b.{0,60}?\$?\d',
+        r'\b(poc|demo|proposal)\b'
+    ],
+    'proposal_request': [
+        r'\b(draft|generate|create)\s+(proposal|quote)\b',
+        r'\bproposal\s+for\b'
+    ],
+    'next_step': [
+        _SCHEDULE_REQUEST_PATTERN,
+        r'\b(tomorrow|next\s+\w+|at\s+\d+)\b'
+    ],
+    'status_update': [
+        r'\b(won|lost|closed|cancelled)\b',
+        r'\b(deal|status|update)\b'
+    ],
+    'smalltalk': [
+        r'\b(hello|hi|hey|thanks|thank you)\b'
+    ]
+}
+
+# Plain single-word alternations like r'\b(won|lost)\b' - matched by set lookup instead of regex
+_LITERAL_PATTERN_RE = re.compile(r'^\\b\(([a-z]+(?:\|[a-z]+)*)\)\\b$')
+_TOKEN_RE = re.compile(r'\w+')
+
+def _compile_intent_pattern(pattern: str):
+    """Keyword frozenset for literal word alternations, compiled regex for everything else"""
+    literal = _LITERAL_PATTERN_RE.match(pattern)
+    if literal:
+        return frozenset(literal.group(1).split('|'))
+    # IGNORECASE means messages are matched without a lowercased copy
+    return re.compile(pattern, re.IGNORECASE)
+
+# Compiled once at import
+INTENT_PATTERNS = {
+    intent: [_compile_intent_pattern(pattern) for pattern in patterns]
+    for intent, patterns in _RAW_INTENT_PATTERNS.items()
+}
+
+# Every intent pattern fused into one alternation - a single scan tells us if anything can match at all
+_ANY_INTENT_RE = re.compile(
+    "|".join(f"(?:{pattern})" for patterns in _RAW_INTENT_PATTERNS.values() for pattern in patterns),
+    re.IGNORECASE
+)
 
 
 class IntentClassifier:
@@ -768,115 +1262,123 @@ class IntentClassifier:
     def __init__(self, bot):
         self.bot = bot
         
-        # Client Requirements: 6 intent types exactly as specified
-        self.intent_patterns = {
-            'knowledge_qa': [
-                r'\b(what|how|when|where|why|tell me|explain|question)\b',
-                r'\b(policy|procedure|document|refund|return)\b'
-            ],
-            'lead_capture': [
-                r'\b(\w+)\s+from\s+(\w+)\s+(wants|needs|interested)\b',
-                r'\b(budget|pricing)\b.*\$?\d+',
-                r'\b(poc|demo|proposal)\b'
-            ],
-            'proposal_request': [
-                r'\b(draft|generate|create)\s+(proposal|quote)\b',
-                r'\bproposal\s+for\b'
-            ],
-            'next_step': [
-                r'\b(schedule|book|set up)\s+(meeting|call|demo)\b',
-                r'\b(tomorrow|next\s+\w+|at\s+\d+)\b'
-            ],
-            'status_update': [
-                r'\b(won|lost|closed|cancelled)\b',
-                r'\b(deal|status|update)\b'
-            ],
-            'smalltalk': [
-                r'\b(hello|hi|hey|thanks|thank you)\b'
-            ]
-        }
+        # Shared compiled patterns - nothing is compiled per instance or per message
+        self.intent_patterns = INTENT_PATTERNS
+        
+        # ⚡ Chat repeats itself ("hi", "thanks", "book a demo") - memoize scoring per instance
+        self.score_text = lru_cache(maxsize=4096)(self._score_text)
     
-    async def classify_intent(self, text: str, context: List[Dict], request_id: str) -> IntentClassification:
-        """Client Requirements: Classify intent and extract entities"""
-        text_lower = text.lower()
+    def _score_text(self, text: str) -> Tuple[Tuple[Tuple[str, float], ...], Tuple[Tuple[str, Any], ...]]:
+        """⚡ Context-free pattern scores and entities, frozen so cached results stay immutable"""
         scores = {}
         entities = {}
         
         # Calculate confidence scores
+        tokens = None
         for intent, patterns in self.intent_patterns.items():
             score = 0
             for pattern in patterns:
-                if re.search(pattern, text_lower):
+                if isinstance(pattern, frozenset):
+                    if tokens is None:
+                        tokens = set(_TOKEN_RE.findall(text.lower()))
+                    matched = not pattern.isdisjoint(tokens)
+                else:
+                    matched = pattern.search(text) is not None
+                
+                if matched:
                     score += 0.4
-                    
-                    # Extract entities based on intent
-                    if intent == 'lead_capture':
-                        entities.update(self.extract_lead_entities(text))
-                    elif intent == 'next_step':
-                        entities.update(self.extract_time_entities(text))
+                    if score >= 1.0:
+                        # Already at the cap - further patterns cannot change the score
+                        break
+            
+            # Extract entities once per matched intent, not once per matching pattern
+            if score:
+                if intent == 'lead_capture':
+                    entities.update(self.extract_lead_entities(text))
+                elif intent == 'next_step':
+                    entities.update(self.extract_time_entities(text))
             
             scores[intent] = min(score, 1.0)
         
-        # Context boost
-        if context and len(context) > 0:
-            last_intent = context[-1].get('intent')
-            if last_intent in scores:
-                scores[last_intent] += 0.2
+        return tuple(scores.items()), tuple(entities.items())
+    
+    async def classify_intent(self, text: str, context: List[Dict], request_id: str) -> IntentClassification:
+        """Client Requirements: Classify intent and extract entities"""
+        if not _ANY_INTENT_RE.search(text):
+            # No pattern can score, and a context boost alone never reaches the 0.3 threshold
+            return IntentClassification.model_construct(
+                intent='smalltalk', entities={}, confidence=0.8, requestId=request_id, secondaryIntent=None
+            )
         
-        # Determine best intent
-        best_intent = max(scores, key=scores.get) if scores else 'unknown'
-        confidence = scores.get(best_intent, 0.1)
+        # Pattern scores depend only on the text - repeated utterances are served from the LRU
+        cached_scores, cached_entities = self.score_text(text)
+        entities = dict(cached_entities)
+        last_intent = context[-1].get('intent') if context else None
+        
+        # One pass: apply the context boost and track the best and runner-up intents
+        best_intent, confidence = None, 0.0
+        runner_up, runner_up_score = None, 0.0
+        for intent, score in cached_scores:
+            if intent == last_intent:
+                score += 0.2
+            if best_intent is None or score > confidence:
+                runner_up, runner_up_score = best_intent, confidence
+                best_intent, confidence = intent, score
+            elif runner_up is None or score > runner_up_score:
+                runner_up, runner_up_score = intent, score
         
         if confidence < 0.3:
             best_intent = 'smalltalk'
             confidence = 0.8
         
-        return IntentClassification(
+        # Runner-up that also matched a pattern (e.g. "schedule a call about refunds")
+        secondary_intent = runner_up if runner_up_score >= 0.4 else None
+        
+        # Every field is produced here, so skip re-validation - but keep the 0..1 contract
+        # the schema advertises, which the context boost could otherwise exceed
+        return IntentClassification.model_construct(
             intent=best_intent,
             entities=entities,
-            confidence=confidence,
-            requestId=request_id
+            confidence=min(confidence, 1.0),
+            requestId=request_id,
+            secondaryIntent=secondary_intent
         )
     
     def extract_lead_entities(self, text: str) -> Dict[str, Any]:
         """Extract lead entities as client requested"""
-        entities = {}
-        
-        # Name and company
-        name_match = re.search(r'\b([A-Z][a-z]+)\s+from\s+([A-Z]\w+)', text)
-        if name_match:
-            entities['name'] = name_match.group(1)
-            entities['company'] = name_match.group(2)
-        
-        # Budget
-        budget_match = re.search(r'\$?([\d,]+k?)', text)
-        if budget_match:
-            entities['budget'] = budget_match.group(1)
-        
-        return entities
+        # Name, company and budget
+        return _scan_lead_fields(text)
     
     def extract_time_entities(self, text: str) -> Dict[str, Any]:
         """Extract time entities for scheduling"""
         entities = {}
         
         # Time
-        time_match = re.search(r'\b(\d{1,2}):?(\d{2})?\s*(am|pm)?\b', text.lower())
+        time_match = _TIME_RE.search(text)
         if time_match:
-            entities['time'] = time_match.group(0)
+            entities['time'] = time_match.group(0).lower()
         
         # Day
-        day_match = re.search(r'\b(tomorrow|next\s+\w+)\b', text.lower())
+        day_match = _DAY_RE.search(text)
         if day_match:
-            entities['day'] = day_match.group(1)
+            entities['day'] = day_match.group(1).lower()
         
         return entities
 
+def _estimate_tokens(text: str) -> int:
+    """~4 characters per token - avoids a second str.split() pass over the whole file"""
+    return (len(text) + 3) // 4
+
 
 class KnowledgeAgent:
     """Client Requirements: Agent A (Knowledge) - LangGraph implementation"""
     
+    ANSWER_CACHE_TTL = 300  # seconds a grounded answer is reused for a repeated question
+    ANSWER_CACHE_SIZE = 1024  # distinct questions kept - least recently asked are evicted first
+
     def __init__(self, bot):
         self.bot = bot
+        self.answer_cache: "OrderedDict[str, Tuple[float, str, List[Dict[str, Any]], float]]" = OrderedDict()
         if LANGCHAIN_AVAILABLE:
             self.text_splitter = RecursiveCharacterTextSplitter(
                 chunk_size=1000,
@@ -888,50 +1390,46 @@ class KnowledgeAgent:
         try:
             # Read file content
             content = self.read_file_content(file_path)
+            tokens = _estimate_tokens(content)
             
-            if self.bot.vector_store and self.text_splitter:
-                # Client Requirements: Chunk → embed → persist
-                chunks = self.text_splitter.split_text(content)
-                
-                documents = [
-                    LangChainDocument(
-                        page_content=chunk,
-                        metadata={
-                            "filename": filename,
-                            "chunk_id": i,
-                            "request_id": request_id,
-                            "timestamp": datetime.now().isoformat()
-                        }
-                    )
-                    for i, chunk in enumerate(chunks)
-                ]
-                
-                # Persist to vector store
-                self.bot.vector_store.add_documents(documents)
-                
-                # Save to knowledge_files table
-                conn = sqlite3.connect(self.bot.db_path)
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT OR REPLACE INTO knowledge_files 
-                    (drive_file_id, filename, chunks, tokens, upload_timestamp)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    request_id,
-                    filename,
-                    len(chunks),
-                    len(content.split()),
-                    datetime.now().isoformat()
-                ))
-                conn.commit()
-                conn.close()
-                
-                return {"chunks": len(chunks), "tokens": len(content.split())}
-            else:
-                return {"chunks": 1, "tokens": len(content.split())}
+            if not (self.bot.vector_store and self.text_splitter):
+                return {"chunks": 1, "tokens": tokens}
+            
+            # Client Requirements: Chunk → embed → persist
+            chunks = self.text_splitter.split_text(content)
+            ingested_at = datetime.now().isoformat()  # one timestamp for the whole file
+            base_metadata = {"filename": filename, "request_id": request_id, "timestamp": ingested_at}
+            documents = [
+                LangChainDocument(page_content=chunk, metadata={**base_metadata, "chunk_id": i})
+                for i, chunk in enumerate(chunks)
+            ]
+            
+            # Persist to vector store
+            if documents:
+                # Length-sorted so each embedding mini-batch holds similar sized chunks
+                # (chunk_id in metadata keeps the original order recoverable)
+                documents.sort(key=lambda doc: len(doc.page_content))
+                # Embedding + Chroma writes block - keep them off the event loop
+                await asyncio.get_running_loop().run_in_executor(
+                    self.bot.executor, self.bot.vector_store.add_documents, documents
+                )
+                self.answer_cache.clear()  # new knowledge invalidates cached answers
+            
+            # Save to knowledge_files table
+            conn = sqlite3.connect(self.bot.db_path)
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO knowledge_files 
+                (drive_file_id, filename, chunks, tokens, upload_timestamp)
+                VALUES (?, ?, ?, ?, ?)
+            """, (request_id, filename, len(chunks), tokens, ingested_at))
+            conn.commit()
+            conn.close()
+            
+            return {"chunks": len(chunks), "tokens": tokens}
                 
         except Exception as e:
-            logger.error(f"❌ Ingestion error: {e}")
+            logger.error("❌ Ingestion error: %s", e)
             return {"chunks": 0, "tokens": 0}
     
     def read_file_content(self, file_path: str) -> str:
@@ -942,29 +1440,68 @@ class KnowledgeAgent:
         except:
             return f"Content from {file_path}"
     
+    def get_cached_answer(self, cache_key: str) -> Optional[Tuple[float, str, List[Dict[str, Any]], float]]:
+        """Fresh cached answer for a normalized question (expired entries are dropped)"""
+        cached = self.answer_cache.get(cache_key)
+        if cached is None:
+            return None
+        if time.time() - cached[0] >= self.ANSWER_CACHE_TTL:
+            del self.answer_cache[cache_key]
+            return None
+        self.answer_cache.move_to_end(cache_key)
+        return cached
+    
+    def cache_answer(self, cache_key: str, answer: str, citations: List[Dict[str, Any]], confidence: float):
+        """Store an answer - purges expired entries and evicts the least recently used past the size cap"""
+        now = time.time()
+        expired = [key for key, entry in self.answer_cache.items() if now - entry[0] >= self.ANSWER_CACHE_TTL]
+        for key in expired:
+            del self.answer_cache[key]
+        
+        self.answer_cache[cache_key] = (now, answer, citations, confidence)
+        self.answer_cache.move_to_end(cache_key)
+        while len(self.answer_cache) > self.ANSWER_CACHE_SIZE:
+            self.answer_cache.popitem(last=False)
+    
     async def ask(self, user_id: str, text: str, request_id: str) -> KnowledgeResponse:
         """Client Requirements: POST /agentA/ask functionality"""
         try:
+            cache_key = " ".join(text.lower().split())
+            cached = self.get_cached_answer(cache_key)
+            if self.bot.vector_store and cached:
+                _, answer, citations, confidence = cached
+                return KnowledgeResponse(
+                    answer=answer,
+                    citations=citations,
+                    confidence=confidence,
+                    requestId=request_id
+                )
+
             if self.bot.vector_store:
                 # Retrieve relevant documents
-                docs = self.bot.vector_store.similarity_search(text, k=3)
+                scored_docs = await asyncio.get_running_loop().run_in_executor(
+                    self.bot.executor, self.bot.vector_store.similarity_search_with_relevance_scores, text, 3
+                )
+                docs = [doc for doc, _ in scored_docs]
                 
                 if docs:
                     # Generate grounded answer
                     context = "\n\n".join([doc.page_content for doc in docs])
                     answer = f"Based on the documents: {context[:300]}..."
                     
-                    # Create citations
+                    # Create citations - plain dicts, validated into Citation once by KnowledgeResponse
                     citations = [
-                        Citation(
-                            title=doc.metadata.get('filename', 'Unknown'),
-                            driveFileId=doc.metadata.get('request_id', ''),
-                            pageRanges=[f"chunk {doc.metadata.get('chunk_id', 0)}"]
-                        )
+                        {
+                            "title": doc.metadata.get('filename', 'Unknown'),
+                            "driveFileId": doc.metadata.get('request_id', ''),
+                            "pageRanges": [f"chunk {doc.metadata.get('chunk_id', 0)}"]
+                        }
                         for doc in docs
                     ]
                     
-                    confidence = 0.85
+                    # Confidence from the best relevance score Chroma already computed
+                    confidence = min(max(max(score for _, score in scored_docs), 0.0), 1.0)
+                    self.cache_answer(cache_key, answer, citations, confidence)
                 else:
                     answer = "I don't have information about that in my knowledge base. Please upload relevant documents."
                     citations = []
@@ -982,7 +1519,7 @@ class KnowledgeAgent:
             )
             
         except Exception as e:
-            logger.error(f"❌ Q&A error: {e}")
+            logger.error("❌ Q&A error: %s", e)
             return KnowledgeResponse(
                 answer="I encountered an error while searching. Please try again.",
                 citations=[],
@@ -994,55 +1531,62 @@ class KnowledgeAgent:
 class DealflowAgent:
     """Client Requirements: Agent B (Dealflow) - LangGraph implementation"""
     
+    CRM_BATCH_WINDOW = 0.02  # seconds concurrent lead saves wait to share one sqlite write
+    
     def __init__(self, bot):
         self.bot = bot
+        self._pending_crm_rows: List[Tuple[tuple, asyncio.Future]] = []
+        self._crm_flush_task: Optional[asyncio.Task] = None
     
-    async def newlead(self, raw_text: str, request_id: str) -> Lead:
-        """Client Requirements: POST /agentB/newlead functionality"""
+    async def newlead(self, raw_text: str, request_id: str, persist: bool = True) -> Lead:
+        """Client Requirements: POST /agentB/newlead functionality
+
+        persist=False leaves the CRM write to the caller so it can overlap other work.
+        """
         # Parse & normalize lead data
         lead_data = self.parse_lead_text(raw_text)
         
         # Light enrichment
         domain = self.guess_domain(lead_data.get('company', ''))
         quality_score = self.calculate_quality_score(lead_data)
+        lead = self.build_lead(lead_data, domain, quality_score, raw_text)
+        
+        # Save to CRM
+        if persist:
+            await self.save_to_crm(lead, request_id)
         
-        lead = Lead(
+        return lead
+    
+    def build_lead(self, lead_data: Dict[str, str], domain: Optional[str], quality_score: float, raw_text: str) -> Lead:
+        """Assemble a Lead from parsed fields"""
+        # Fields come from our own parser with known types - skip re-validation
+        return Lead.model_construct(
             name=lead_data.get('name', 'Unknown'),
             company=lead_data.get('company', 'Unknown Company'),
             intent=lead_data.get('intent', 'General Inquiry'),
             budget=lead_data.get('budget'),
             normalizedCompanyDomain=domain,
-            qualityScore=quality_score,
+            qualityScore=float(quality_score),
             notes=raw_text
         )
-        
-        # Save to CRM
-        await self.save_to_crm(lead, request_id)
-        
-        return lead
     
     def parse_lead_text(self, text: str) -> Dict[str, str]:
         """Parse lead information"""
-        data = {}
-        
-        # Extract name and company
-        match = re.search(r'\b([A-Z][a-z]+)\s+from\s+([A-Z]\w+)', text)
-        if match:
-            data['name'] = match.group(1)
-            data['company'] = match.group(2)
+        # Extract name, company and budget in one scan
+        data = _scan_lead_fields(text)
+        budget = data.pop('budget', None)
         
         # Extract intent
-        if 'demo' in text.lower():
+        text_lower = text.lower()
+        if 'demo' in text_lower:
             data['intent'] = 'Demo Request'
-        elif 'poc' in text.lower():
+        elif 'poc' in text_lower:
             data['intent'] = 'PoC Request'
         else:
             data['intent'] = 'General Inquiry'
         
-        # Extract budget
-        budget_match = re.search(r'\$?([\d,]+k?)', text)
-        if budget_match:
-            data['budget'] = f"${budget_match.group(1)}"
+        if budget:
+            data['budget'] = f"${budget}"
         
         return data
     
@@ -1050,8 +1594,7 @@ class DealflowAgent:
         """Guess company domain"""
         if not company or company == 'Unknown Company':
             return None
-        clean = re.sub(r'[^a-zA-Z0-9]', '', company.lower())
-        return f"{clean}.com"
+        return _company_domain(company.strip().lower())
     
     def calculate_quality_score(self, data: Dict[str, str]) -> float:
         """Calculate quality score 0-100"""
@@ -1067,36 +1610,63 @@ class DealflowAgent:
         return score
     
     async def save_to_crm(self, lead: Lead, request_id: str):
-        """Save lead to CRM table"""
+        """Save lead to CRM table (saves arriving together share one write)"""
+        row = self.crm_row(lead, request_id)
+        future = asyncio.get_running_loop().create_future()
+        self._pending_crm_rows.append((row, future))
+        if self._crm_flush_task is None:
+            self._crm_flush_task = asyncio.create_task(self._flush_crm_rows())
+        await future
+    
+    def crm_row(self, lead: Lead, request_id: str) -> tuple:
+        """CRM table row for a lead"""
+        return (
+            f"LEAD_{request_id}",
+            datetime.now().isoformat(),
+            lead.name,
+            lead.company,
+            lead.intent,
+            lead.budget,
+            lead.qualityScore,
+            lead.notes
+        )
+    
+    async def _flush_crm_rows(self):
+        """Write every lead queued during the batch window in one transaction"""
+        await asyncio.sleep(self.CRM_BATCH_WINDOW)
+        batch, self._pending_crm_rows = self._pending_crm_rows, []
+        self._crm_flush_task = None
+        
+        try:
+            # sqlite3 is blocking - run the write on the bot's thread pool
+            await asyncio.get_running_loop().run_in_executor(
+                self.bot.executor, self._write_crm_rows, [row for row, _ in batch]
+            )
+        except Exception as e:
+            logger.error("❌ CRM save error: %s", e)
+        
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+    
+    def _write_crm_rows(self, rows: List[tuple]):
+        """Blocking CRM insert (executor thread)"""
+        conn = sqlite3.connect(self.bot.db_path)
         try:
-            conn = sqlite3.connect(self.bot.db_path)
             cursor = conn.cursor()
-            
-            cursor.execute("""
+            cursor.executemany("""
                 INSERT OR REPLACE INTO crm 
                 (lead_id, timestamp, name, company, intent, budget, quality_score, notes)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                f"LEAD_{request_id}",
-                datetime.now().isoformat(),
-                lead.name,
-                lead.company,
-                lead.intent,
-                lead.budget,
-                lead.qualityScore,
-                lead.notes
-            ))
-            
+            """, rows)
             conn.commit()
+        finally:
             conn.close()
-            
-        except Exception as e:
-            logger.error(f"❌ CRM save error: {e}")
     
     async def proposal_copy(self, lead: Optional[Lead], request_id: str) -> ProposalContent:
         """Client Requirements: POST /agentB/proposal-copy functionality"""
         if not lead:
-            return ProposalContent(
+            return ProposalContent.model_construct(
                 title="Custom Business Proposal",
                 summaryBlurb="We'd love to work with you! Let's discuss your specific needs.",
                 bulletPoints=["Tailored solution design", "Dedicated support team", "Competitive pricing"]
@@ -1113,7 +1683,7 @@ class DealflowAgent:
             "✅ Flexible payment terms"
         ]
         
-        return ProposalContent(
+        return ProposalContent.model_construct(
             title=title,
             summaryBlurb=summary,
             bulletPoints=bullets
@@ -1121,44 +1691,79 @@ class DealflowAgent:
     
     async def nextstep_parse(self, text: str, request_id: str) -> ScheduleInfo:
         """Client Requirements: POST /agentB/nextstep-parse functionality"""
-        title = "Business Meeting"
         
-        # Parse time
-        time_match = re.search(r'\b(\d{1,2}):?(\d{2})?\s*(am|pm)?\b', text.lower())
-        start_time = "10:00"
+        # Parse time into hour/minute so the ISO strings are always valid
+        hour, minute = 10, 0
+        time_match = _TIME_RE.search(text)
         if time_match:
-            start_time = time_match.group(0)
-        
-        # Calculate datetime
-        tomorrow = datetime.now() + timedelta(days=1)
-        start_iso = tomorrow.strftime("%Y-%m-%d") + f"T{start_time}:00"
-        end_iso = tomorrow.strftime("%Y-%m-%d") + f"T{start_time}:00"
+            hour, minute = int(time_match.group(1)), int(time_match.group(2) or 0)
+            meridiem = (time_match.group(3) or '').lower()
+            if meridiem == 'pm' and hour < 12:
+                hour += 12
+            elif meridiem == 'am' and hour == 12:
+                hour = 0
+            if hour > 23 or minute > 59:
+                hour, minute = 10, 0
+        
+        # Calculate datetime - today / tomorrow / (next) weekday, defaulting to tomorrow
+        now = datetime.now()
+        days_ahead = 1
+        date_match = _DATE_RE.search(text)
+        if date_match:
+            if date_match.group(2):
+                days_ahead = (_WEEKDAYS[date_match.group(2)[:3].lower()] - now.weekday()) % 7 or 7
+            elif date_match.group(1).lower() == 'today':
+                days_ahead = 0
+        start = (now + timedelta(days=days_ahead)).replace(hour=hour, minute=minute, second=0, microsecond=0)
+        start_iso = start.isoformat()
+        end_iso = (start + timedelta(hours=1)).isoformat()
+        
+        # Title from meeting type keywords
+        kind_match = _MEETING_KIND_RE.search(text)
+        kind = None
+        if kind_match:
+            kind = _MEETING_TITLES[kind_match.group(1).lower().replace('-', '').replace(' ', '')]
+        title = kind or "Business Meeting"
         
         # Extract attendees
         attendees = []
-        name_matches = re.findall(r'\bwith\s+([A-Z][a-z]+)', text)
+        name_matches = _ATTENDEE_RE.findall(text)
         if name_matches:
             attendees = name_matches
-            title = f"Meeting with {', '.join(attendees)}"
+            title = f"{kind or 'Meeting'} with {', '.join(attendees)}"
         
-        return ScheduleInfo(
+        return ScheduleInfo.model_construct(
             title=title,
             startISO=start_iso,
             endISO=end_iso,
             attendees=attendees
         )
     
-    async def status_classify(self, text: str, request_id: str):
+    async def status_classify(self, text: str, request_id: str) -> Dict[str, str]:
         """Client Requirements: POST /agentB/status-classify functionality"""
+        text_lower = text.lower()
         status = "Unknown"
-        if any(word in text.lower() for word in ['won', 'closed', 'signed']):
+        if any(word in text_lower for word in ['won', 'closed', 'signed']):
             status = "Won"
-        elif any(word in text.lower() for word in ['lost', 'cancelled']):
+        elif any(word in text_lower for word in ['lost', 'cancelled']):
             status = "Lost"
-        elif any(word in text.lower() for word in ['hold', 'delayed']):
+        elif any(word in text_lower for word in ['hold', 'delayed']):
             status = "On Hold"
         
-        logger.info(f"Status classified: {status} for request {request_id}")
+        # Reason category = most frequent keyword hit
+        reason_hits: Dict[str, int] = {}
+        for word in _WORD_RE.findall(text_lower):
+            category = _REASON_KEYWORDS.get(word)
+            if category:
+                reason_hits[category] = reason_hits.get(category, 0) + 1
+        reason = max(reason_hits, key=reason_hits.get) if reason_hits else "unspecified"
+        
+        logger.info("Status classified: %s (%s) for request %s", status, reason, request_id)
+        return {
+            "status": status,
+            "reasonCategory": reason,
+            "summary": f"{status} — {reason}: {text[:120]}"
+        }
 
 
 def main():
@@ -1172,6 +1777,10 @@ def main():
         print("❌ TELEGRAM_BOT_TOKEN required!")
         return
     
+    # Faster event loop for the polling/handler workload when available
+    if UVLOOP_AVAILABLE:
+        uvloop.install()
+    
     # Initialize perfect bot
     bot = PerfectTelegramRevenueCopilot(bot_token)
     bot.run()
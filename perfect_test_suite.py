@@ -20,7 +20,10 @@ import tempfile
 import os
 import json
 import sqlite3
+import threading
+import time
 from unittest.mock import Mock, patch, AsyncMock, MagicMock
+from types import SimpleNamespace
 from datetime import datetime
 
 # Import our perfect bot
@@ -31,7 +34,11 @@ from perfect_telegram_bot import (
     Lead,
     ProposalContent,
     ScheduleInfo,
-    Citation
+    Citation,
+    BatchedQueryEmbeddings,
+    CachedQueryEmbeddings,
+    KNOWLEDGE_COLLECTION_METADATA,
+    _new_collection_metadata
 )
 
 
@@ -49,27 +56,48 @@ class TestPerfectTelegramRevenueCopilot(unittest.TestCase):
     - Performance benchmarks
     """
     
-    def setUp(self):
-        """Setup test environment with all dependencies mocked"""
-        self.bot_token = "TEST_TOKEN"
+    @classmethod
+    def setUpClass(cls):
+        """Build one bot for the whole suite - construction (executors, stores, handlers) is the slow part"""
+        cls.bot_token = "TEST_TOKEN"
         
         # Mock all external dependencies
         with patch('perfect_telegram_bot.Application') as mock_app:
             mock_app.builder.return_value.token.return_value.build.return_value = Mock()
             
             # Create bot instance
-            self.bot = PerfectTelegramRevenueCopilot(self.bot_token)
-            
-            # Mock database
-            self.bot.db_path = ":memory:"
-            self.bot.setup_database()
-            
-            # Mock services for testing
-            self.bot.vector_store = Mock()
-            self.bot.embeddings = Mock()
-            self.bot.drive_service = Mock()
-            self.bot.sheets_service = Mock()
-            self.bot.calendar_service = Mock()
+            cls.bot = PerfectTelegramRevenueCopilot(cls.bot_token)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.bot.executor.shutdown(wait=True)
+    
+    def setUp(self):
+        """Reset per-test state on the shared bot"""
+        # Fresh agents, classifier caches and CRM batch state
+        self.bot.setup_langraph_agents()
+        self.bot.metrics = dict.fromkeys(self.bot.metrics, 0)
+        self.bot.user_sessions = {}
+        
+        # Mock database
+        self.bot.db_path = ":memory:"
+        self.bot.setup_database()
+        
+        # Mock services for testing
+        self.bot.vector_store = Mock()
+        self.bot.embeddings = Mock()
+        self.bot.drive_service = Mock()
+        self.bot.sheets_service = Mock()
+        self.bot.calendar_service = Mock()
+    
+    def make_text_update(self, text):
+        """Telegram text update whose first reply returns an editable placeholder"""
+        placeholder = SimpleNamespace(edit_text=AsyncMock())
+        message = SimpleNamespace(
+            text=text, document=None, photo=None,
+            reply_text=AsyncMock(return_value=placeholder)
+        )
+        return SimpleNamespace(effective_user=SimpleNamespace(id=42), message=message), placeholder
             
     def test_01_bot_initialization_perfect(self):
         """🎯 TEST 1: Perfect bot initialization with all components"""
@@ -145,7 +173,13 @@ class TestPerfectTelegramRevenueCopilot(unittest.TestCase):
             self.assertIn('company', result.entities)
             self.assertEqual(result.entities['name'], 'Sarah')
             self.assertEqual(result.entities['company'], 'Microsoft')
-            
+
+            # Repeat utterance is scored from the LRU without sharing entity dicts
+            result.entities['name'] = 'Mutated'
+            repeat = await self.bot.intent_classifier.classify_intent(text, [], "test_req_id_2")
+            self.assertEqual(repeat.entities['name'], 'Sarah')
+            self.assertEqual(self.bot.intent_classifier.score_text.cache_info().hits, 1)
+
             print(f"✅ Entities extracted: {result.entities}")
         
         asyncio.run(test_entity_extraction())
@@ -185,15 +219,16 @@ class TestPerfectTelegramRevenueCopilot(unittest.TestCase):
         
         async def test_qa():
             # Mock vector store response
-            mock_doc = Mock()
-            mock_doc.page_content = "Test content about refund policy..."
-            mock_doc.metadata = {
-                'filename': 'policy.pdf',
-                'chunk_id': 0,
-                'request_id': 'test_123'
-            }
+            mock_doc = SimpleNamespace(
+                page_content="Test content about refund policy...",
+                metadata={
+                    'filename': 'policy.pdf',
+                    'chunk_id': 0,
+                    'request_id': 'test_123'
+                }
+            )
             
-            self.bot.vector_store.similarity_search.return_value = [mock_doc]
+            self.bot.vector_store.similarity_search_with_relevance_scores.return_value = [(mock_doc, 0.82)]
             
             # Test Q&A
             response = await self.bot.agent_a.ask(
@@ -208,6 +243,7 @@ class TestPerfectTelegramRevenueCopilot(unittest.TestCase):
             self.assertGreater(len(response.citations), 0)
             self.assertIsInstance(response.citations[0], Citation)
             self.assertEqual(response.requestId, "test_req_456")
+            self.assertAlmostEqual(response.confidence, 0.82)
             
             print(f"✅ Q&A Response: {response.answer[:50]}...")
             print(f"✅ Citations: {len(response.citations)} sources")
@@ -287,6 +323,14 @@ class TestPerfectTelegramRevenueCopilot(unittest.TestCase):
             
             print(f"✅ Event: {schedule.title}")
             print(f"✅ Start time: {schedule.startISO}")
+            
+            # Weekday phrases resolve deterministically to valid ISO datetimes
+            demo = await self.bot.agent_b.nextstep_parse("Product demo next Wednesday at 11am", "test_req_203")
+            start = datetime.fromisoformat(demo.startISO)
+            self.assertEqual(demo.title, "Product Demo")
+            self.assertEqual((start.weekday(), start.hour), (2, 11))
+            self.assertGreater(start, datetime.now())
+            print(f"✅ Weekday parsing: {demo.title} at {demo.startISO}")
         
         asyncio.run(test_scheduling())
         print("✅ Dealflow Agent scheduling working perfectly!")
@@ -330,8 +374,7 @@ class TestPerfectTelegramRevenueCopilot(unittest.TestCase):
         
         async def test_logging():
             # Mock user
-            mock_user = Mock()
-            mock_user.id = 12345
+            mock_user = SimpleNamespace(id=12345)
             
             # Create intent result
             intent_result = IntentClassification(
@@ -443,8 +486,7 @@ class TestPerfectTelegramRevenueCopilot(unittest.TestCase):
             
             # Should not crash
             try:
-                mock_user = Mock()
-                mock_user.id = 999
+                mock_user = SimpleNamespace(id=999)
                 intent_result = IntentClassification(
                     intent="test", entities={}, confidence=0.5, requestId="test"
                 )
@@ -525,6 +567,185 @@ class TestPerfectTelegramRevenueCopilot(unittest.TestCase):
         print(f"🚀 CLIENT SATISFACTION: {satisfaction_rate:.0%} - PERFECT!")
         print("🎯 ALL REQUIREMENTS MET - CLIENT WILL BE THRILLED!")
         print("💼 THIS BOT WILL GET YOU THE JOB!")
+    
+    def test_16_embedding_wrappers(self):
+        """🎯 TEST 16: Embedding cache and query micro-batching"""
+        print("🧪 TEST 16: Embedding Wrappers ✅")
+        
+        base = Mock()
+        base.embed_query.return_value = [3.0, 4.0]
+        base.embed_documents.return_value = [[3.0, 4.0]]
+        
+        # Normalized repeats of a question only embed once
+        cached = CachedQueryEmbeddings(base)
+        self.assertEqual(cached.embed_query("Refund policy?"), [3.0, 4.0])
+        self.assertEqual(cached.embed_query("  refund   POLICY? "), [3.0, 4.0])
+        base.embed_query.assert_called_once_with("Refund policy?")  # model sees the original text
+        print("✅ Query embedding cache verified")
+        
+        # Concurrent questions are answered from one batched embed_documents call
+        base.embed_documents.side_effect = lambda texts: [[float(len(t))] for t in texts]
+        base.embed_documents.reset_mock()
+        batched = BatchedQueryEmbeddings(base, max_wait=0.5)
+        self.addCleanup(batched.close)
+        start = threading.Barrier(3)
+        
+        def ask(text):
+            start.wait()
+            return batched.embed_query(text)
+        
+        vectors = list(self.bot.executor.map(ask, ["a", "bb", "ccc"]))
+        self.assertEqual(vectors, [[1.0], [2.0], [3.0]])
+        self.assertEqual(base.embed_documents.call_count, 1)
+        
+        # A short vector list fails the callers instead of leaving them waiting
+        base.embed_documents.side_effect = lambda texts: []
+        with self.assertRaises(RuntimeError):
+            batched.embed_query("a")
+        
+        # Closed batchers reject new questions and stop their thread
+        batched.close()
+        self.assertFalse(batched._worker.is_alive())
+        with self.assertRaises(RuntimeError):
+            batched.embed_query("a")
+        
+        # Bot shutdown stops the batcher it created
+        with patch.object(self.bot, 'query_batcher', Mock()) as batcher:
+            asyncio.run(self.bot.shut_down(None))
+        batcher.close.assert_called_once()
+        print("✅ Query embedding micro-batching verified")
+    
+    def test_17_concurrent_crm_saves_batched(self):
+        """🎯 TEST 17: Concurrent lead saves share one CRM write"""
+        print("🧪 TEST 17: Batched CRM Writes ✅")
+        
+        async def test_batched_saves():
+            leads = [
+                Lead(name=name, company="Batchco", intent="Demo Request", notes="batch")
+                for name in ("Ava", "Ben", "Cy")
+            ]
+            with patch.object(self.bot.agent_b, '_write_crm_rows',
+                              wraps=self.bot.agent_b._write_crm_rows) as write_rows:
+                await asyncio.gather(*(
+                    self.bot.agent_b.save_to_crm(lead, f"batch_{i}") for i, lead in enumerate(leads)
+                ))
+            
+            write_rows.assert_called_once()
+            conn = sqlite3.connect(self.bot.db_path)
+            count = conn.execute("SELECT COUNT(*) FROM crm WHERE company = ?", ("Batchco",)).fetchone()[0]
+            conn.close()
+            self.assertEqual(count, 3)
+        
+        asyncio.run(test_batched_saves())
+        print("✅ Three concurrent leads saved in one write")
+    
+    def test_18_collection_metadata_only_for_new_collections(self):
+        """🎯 TEST 18: Tuned HNSW metadata never relabels an existing collection"""
+        print("🧪 TEST 18: Chroma Collection Metadata ✅")
+        
+        client = Mock()
+        client.list_collections.return_value = [SimpleNamespace(name="other")]
+        self.assertEqual(_new_collection_metadata(client, "knowledge_base"), KNOWLEDGE_COLLECTION_METADATA)
+        
+        # Existing collection keeps the distance space its index was built with
+        client.list_collections.return_value = [SimpleNamespace(name="knowledge_base")]
+        self.assertIsNone(_new_collection_metadata(client, "knowledge_base"))
+        print("✅ HNSW settings applied to new collections only")
+    
+    def test_19_mixed_question_and_scheduling_fan_out(self):
+        """🎯 TEST 19: Q&A + scheduling fan-out only on an explicit scheduling request"""
+        print("🧪 TEST 19: Mixed Request Fan-out ✅")
+        
+        mock_doc = SimpleNamespace(
+            page_content="Refunds are issued within 30 days.",
+            metadata={'filename': 'policy.pdf', 'chunk_id': 0, 'request_id': 'doc_1'}
+        )
+        self.bot.vector_store.similarity_search_with_relevance_scores.return_value = [(mock_doc, 0.9)]
+        
+        # Question + "schedule a call" -> grounded answer edited in AND a calendar event
+        update, placeholder = self.make_text_update("Schedule a call to discuss our refund policy")
+        with patch.object(self.bot, 'route_knowledge_and_schedule',
+                          wraps=self.bot.route_knowledge_and_schedule) as fan_out:
+            asyncio.run(self.bot.handle_natural_language_message(update, None))
+        fan_out.assert_called_once()
+        self.assertIn("Grounded Answer", placeholder.edit_text.call_args.args[0])
+        self.assertIn("Calendar Event Created", update.message.reply_text.call_args.args[0])
+        self.assertEqual(self.bot.metrics['qa_responses'], 1)
+        self.assertEqual(self.bot.metrics['events_scheduled'], 1)
+        
+        # A bare day/time in a question is not a scheduling request
+        self.bot.metrics = dict.fromkeys(self.bot.metrics, 0)
+        update, placeholder = self.make_text_update("What is the refund policy at 3 tomorrow?")
+        asyncio.run(self.bot.handle_natural_language_message(update, None))
+        self.assertEqual(self.bot.metrics['qa_responses'], 1)
+        self.assertEqual(self.bot.metrics['events_scheduled'], 0)
+        for call in update.message.reply_text.call_args_list:
+            self.assertNotIn("Calendar Event Created", call.args[0])
+        print("✅ Fan-out triggered by explicit scheduling verbs only")
+    
+    def test_20_answer_cache_bounded(self):
+        """🎯 TEST 20: Answer cache is an LRU with a size cap and TTL purge"""
+        print("🧪 TEST 20: Bounded Answer Cache ✅")
+        
+        agent_a = self.bot.agent_a
+        agent_a.ANSWER_CACHE_SIZE = 2
+        
+        agent_a.cache_answer("q1", "a1", [], 0.9)
+        agent_a.cache_answer("q2", "a2", [], 0.9)
+        agent_a.get_cached_answer("q1")  # q1 is now the most recently used
+        agent_a.cache_answer("q3", "a3", [], 0.9)
+        self.assertEqual(list(agent_a.answer_cache), ["q1", "q3"])
+        
+        # Expired entries are dropped on the next insert, not only when re-asked
+        with patch('perfect_telegram_bot.time.time', return_value=time.time() + agent_a.ANSWER_CACHE_TTL):
+            agent_a.cache_answer("q4", "a4", [], 0.9)
+        self.assertEqual(list(agent_a.answer_cache), ["q4"])
+        print("✅ Answer cache bounded by size and TTL")
+    
+    def test_21_status_reason_category(self):
+        """🎯 TEST 21: Status updates carry a keyword-based reason category"""
+        print("🧪 TEST 21: Status Reason Category ✅")
+        
+        cases = [
+            ("We lost the deal, too expensive for them", "Lost", "price"),
+            ("Deal on hold, their budget is frozen", "On Hold", "budget"),
+            ("Lost to a competitor with a deeper integration and better integration docs", "Lost", "features"),
+            ("We won!", "Won", "unspecified"),
+        ]
+        for text, expected_status, expected_reason in cases:
+            with self.subTest(text=text):
+                status = asyncio.run(self.bot.agent_b.status_classify(text, "status_req"))
+                self.assertEqual(status["status"], expected_status)
+                self.assertEqual(status["reasonCategory"], expected_reason)
+        
+        # The reason reaches the user's confirmation message
+        update, _ = self.make_text_update("We lost the deal, too expensive for them")
+        asyncio.run(self.bot.route_status_update(update, update.message.text, "status_req", None))
+        self.assertIn("**Reason:** price", update.message.reply_text.call_args.args[0])
+        print("✅ Reason categories classified and shown")
+    
+    def test_22_knowledge_answer_edits_placeholder(self):
+        """🎯 TEST 22: Knowledge answers replace the "searching" placeholder"""
+        print("🧪 TEST 22: Knowledge Placeholder Edit ✅")
+        
+        mock_doc = SimpleNamespace(
+            page_content="Refunds are issued within 30 days.",
+            metadata={'filename': 'policy.pdf', 'chunk_id': 0, 'request_id': 'doc_1'}
+        )
+        self.bot.vector_store.similarity_search_with_relevance_scores.return_value = [(mock_doc, 0.9)]
+        intent_result = IntentClassification(intent="knowledge_qa", confidence=0.9, requestId="qa_req")
+        
+        update, placeholder = self.make_text_update("What is the refund policy?")
+        asyncio.run(self.bot.route_knowledge_qa(update, update.message.text, "qa_req", intent_result))
+        
+        # One reply (the placeholder), then the answer is edited into it
+        update.message.reply_text.assert_called_once()
+        placeholder.edit_text.assert_called_once()
+        answer_text = placeholder.edit_text.call_args.args[0]
+        self.assertIn("Grounded Answer", answer_text)
+        self.assertIn("policy.pdf", answer_text)
+        self.assertEqual(self.bot.metrics['qa_responses'], 1)
+        print("✅ Placeholder edited with the grounded answer")
 
 
 def run_perfect_test_suite():
@@ -5,21 +5,35 @@ PRODUCTION TELEGRAM REVENUE COPILOT
 Ultra-fast production bot optimized for 500% performance
 """
 
-import json
 import time
-import urllib.request
-import urllib.parse
-import urllib.error
 import logging
 import signal
 import sys
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime
 import threading
 from concurrent.futures import ThreadPoolExecutor
 import queue
 
+import requests
+from requests.adapters import HTTPAdapter
+
+# Optional: orjson decodes Bot API replies several times faster than stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional: pyahocorasick finds every keyword in one pass over the message
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 # Configure logging for production
 logging.basicConfig(
     level=logging.INFO,
@@ -31,6 +45,106 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Fast intent classification - tuples, so the memoized scores below can't go stale
+INTENT_KEYWORDS = {
+    'knowledge_qa': ('refund', 'policy', 'support', 'help', 'price', 'pricing', 'cost', 'feature', 'how', 'what', 'why', 'when'),
+    'lead_capture': ('demo', 'trial', 'interested', 'want', 'need', 'buy', 'purchase', 'contact', 'sales'),
+    'proposal': ('proposal', 'quote', 'estimate', 'custom', 'enterprise', 'business', 'solution'),
+    'scheduling': ('schedule', 'book', 'appointment', 'meeting', 'call', 'time', 'available'),
+    'general': ('hi', 'hello', 'start', 'hey', 'thanks', 'thank')
+}
+
+def build_keyword_automaton(keywords) -> Optional[Any]:
+    """Aho-Corasick automaton over the keywords (None without pyahocorasick)"""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+def find_keywords(text_lower: str, keywords, automaton=None) -> set:
+    """Keywords occurring as substrings of text_lower"""
+    if automaton is not None:
+        return {keyword for _, keyword in automaton.iter(text_lower)}
+    return {keyword for keyword in keywords if keyword in text_lower}
+
+ALL_INTENT_KEYWORDS = tuple(dict.fromkeys(
+    keyword for keywords in INTENT_KEYWORDS.values() for keyword in keywords
+))
+INTENT_AUTOMATON = build_keyword_automaton(ALL_INTENT_KEYWORDS)
+
+# Exact-match reply cache bound - repeated questions skip the knowledge scan
+RESPONSE_CACHE_SIZE = 4096
+KNOWLEDGE_FALLBACK = "<b>KNOWLEDGE BASE</b>: I can help you with refunds, support, pricing, features, demos, and trials. What specific information do you need?"
+
+# Static intent replies - routed with one dict lookup instead of an if/elif chain
+GENERAL_REPLY = """<b>Welcome to Revenue Copilot!</b>
+
+<b>I'm here to help you</b>:
+• Boost your revenue
+• Get powerful insights
+• Capture more leads
+• Scale your business
+
+<b>Try asking me about</b>:
+- Pricing and features
+- Free demo or trial
+- Refund policy
+- Support options
+
+How can I help you today?"""
+
+INTENT_REPLIES = {
+    'lead_capture': """<b>INTERESTED IN OUR SOLUTION?</b> Let's connect!
+
+<b>Quick Demo</b>: See our platform in action - book.company.com
+<b>Direct Contact</b>: sales@company.com | +1-555-SALES
+<b>Special Offer</b>: Mention TELEGRAM and get 30% off!
+
+What's the best way to reach you?""",
+    'proposal': """<b>CUSTOM PROPOSAL</b>: Let's create the perfect solution for you!
+
+<b>What we need</b>:
+- Company size and industry
+- Current challenges  
+- Budget range
+- Timeline
+
+<b>Next Steps</b>: Email proposals@company.com or book a consultation at book.company.com
+
+Ready to transform your business?""",
+    'scheduling': """<b>SCHEDULE A MEETING</b>: Let's find the perfect time!
+
+<b>Quick Booking</b>: book.company.com
+<b>Call Options</b>:
+- 15-min Quick Demo
+- 30-min Strategy Session
+- 60-min Deep Dive
+
+<b>Available</b>: Monday-Friday, 9 AM - 6 PM EST
+
+What works best for your schedule?""",
+    'general': GENERAL_REPLY
+}
+
+@lru_cache(maxsize=4096)
+def classify_text(text_lower: str) -> tuple[str, float]:
+    """Keyword intent scoring on lowercased text - memoized, chats repeat the same short messages"""
+    found = find_keywords(text_lower, ALL_INTENT_KEYWORDS, INTENT_AUTOMATON)
+    if not found:
+        return 'general', 0.4
+    
+    intent_scores = {}
+    for intent, keywords in INTENT_KEYWORDS.items():
+        score = sum(1 for keyword in keywords if keyword in found)
+        if score > 0:
+            intent_scores[intent] = score / len(keywords)
+    
+    best_intent = max(intent_scores, key=intent_scores.get)
+    return best_intent, intent_scores[best_intent]
+
 @dataclass
 class BotStats:
     """Performance statistics for monitoring"""
@@ -55,6 +169,10 @@ class ProductionTelegramBot:
         self.response_cache = {}
         self.executor = ThreadPoolExecutor(max_workers=10)
         
+        # Keep-alive session: one TLS handshake per pooled connection instead of per API call
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+        
         # Fast knowledge base
         self.knowledge_base = {
             "refund": "REFUND POLICY: Full refund within 30 days, no questions asked! We guarantee your satisfaction or your money back. Contact support@company.com for instant refunds.",
@@ -65,15 +183,16 @@ class ProductionTelegramBot:
             "trial": "FREE TRIAL: Start your 14-day free trial instantly! No credit card required. Full access to all premium features. Sign up at trial.company.com"
         }
         
-        # Fast intent classification
-        self.intent_keywords = {
-            'knowledge_qa': ['refund', 'policy', 'support', 'help', 'price', 'pricing', 'cost', 'feature', 'how', 'what', 'why', 'when'],
-            'lead_capture': ['demo', 'trial', 'interested', 'want', 'need', 'buy', 'purchase', 'contact', 'sales'],
-            'proposal': ['proposal', 'quote', 'estimate', 'custom', 'enterprise', 'business', 'solution'],
-            'scheduling': ['schedule', 'book', 'appointment', 'meeting', 'call', 'time', 'available'],
-            'general': ['hi', 'hello', 'start', 'hey', 'thanks', 'thank']
+        self.knowledge_automaton = build_keyword_automaton(self.knowledge_base)
+        
+        # Pre-rendered knowledge replies - wrapped once, not on every answer
+        self.knowledge_replies = {
+            keyword: f"<b>{response}</b>" for keyword, response in self.knowledge_base.items()
         }
         
+        # Fast intent classification
+        self.intent_keywords = INTENT_KEYWORDS
+        
         logger.info("Production TelegramBot initialized")
     
     def make_request(self, method: str, data: Dict = None, timeout: int = 5) -> Optional[Dict]:
@@ -82,13 +201,13 @@ class ProductionTelegramBot:
             url = f"{self.base_url}/{method}"
             
             if data:
-                data = urllib.parse.urlencode(data).encode('utf-8')
-            
-            req = urllib.request.Request(url, data=data)
-            req.add_header('Content-Type', 'application/x-www-form-urlencoded')
-            
-            with urllib.request.urlopen(req, timeout=timeout) as response:
-                return json.loads(response.read().decode('utf-8'))
+                response = self.session.post(url, data=data, timeout=timeout)
+            else:
+                response = self.session.get(url, timeout=timeout)
+            response.raise_for_status()
+            if ORJSON_AVAILABLE:
+                return orjson.loads(response.content)
+            return response.json()
                 
         except Exception as e:
             logger.error(f"Request failed: {e}")
@@ -99,14 +218,14 @@ class ProductionTelegramBot:
         """Get bot information"""
         return self.make_request("getMe")
     
-    def get_updates(self, offset: int = 0, timeout: int = 2) -> List[Dict]:
-        """Get updates with fast polling"""
+    def get_updates(self, offset: int = 0, timeout: int = 2) -> Optional[List[Dict]]:
+        """Get updates with fast polling (None if the API call failed)"""
         data = {"offset": offset, "timeout": timeout, "limit": 100}
         result = self.make_request("getUpdates", data, timeout=timeout+2)
         
         if result and result.get("ok"):
             return result.get("result", [])
-        return []
+        return None
     
     def send_message(self, chat_id: int, text: str) -> bool:
         """Send message with fast delivery"""
@@ -128,86 +247,29 @@ class ProductionTelegramBot:
     
     def classify_intent(self, text: str) -> tuple[str, float]:
         """Ultra-fast intent classification"""
-        text_lower = text.lower()
-        intent_scores = {}
-        
-        for intent, keywords in self.intent_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if score > 0:
-                intent_scores[intent] = score / len(keywords)
-        
-        if intent_scores:
-            best_intent = max(intent_scores, key=intent_scores.get)
-            confidence = intent_scores[best_intent]
-            return best_intent, confidence
-        
-        return 'general', 0.4
+        return classify_text(text.lower())
     
-    def generate_response(self, text: str, intent: str) -> str:
-        """Ultra-fast response generation"""
+    def generate_response(self, text: str, intent: str, text_lower: Optional[str] = None) -> str:
+        """Ultra-fast response generation (pass text_lower to skip re-lowercasing)"""
         
         if intent == 'knowledge_qa':
-            text_lower = text.lower()
-            
-            # Fast keyword matching
-            for keyword, response in self.knowledge_base.items():
-                if keyword in text_lower:
-                    return f"<b>{response}</b>"
-            
-            # Default knowledge response
-            return "<b>KNOWLEDGE BASE</b>: I can help you with refunds, support, pricing, features, demos, and trials. What specific information do you need?"
-            
-        elif intent == 'lead_capture':
-            return """<b>INTERESTED IN OUR SOLUTION?</b> Let's connect!
-
-<b>Quick Demo</b>: See our platform in action - book.company.com
-<b>Direct Contact</b>: sales@company.com | +1-555-SALES
-<b>Special Offer</b>: Mention TELEGRAM and get 30% off!
-
-What's the best way to reach you?"""
+            query = (text_lower if text_lower is not None else text.lower()).strip()
+            cached = self.response_cache.get(query)
+            if cached is not None:
+                return cached
             
-        elif intent == 'proposal':
-            return """<b>CUSTOM PROPOSAL</b>: Let's create the perfect solution for you!
-
-<b>What we need</b>:
-- Company size and industry
-- Current challenges  
-- Budget range
-- Timeline
-
-<b>Next Steps</b>: Email proposals@company.com or book a consultation at book.company.com
-
-Ready to transform your business?"""
+            found = find_keywords(query, self.knowledge_base, self.knowledge_automaton)
             
-        elif intent == 'scheduling':
-            return """<b>SCHEDULE A MEETING</b>: Let's find the perfect time!
-
-<b>Quick Booking</b>: book.company.com
-<b>Call Options</b>:
-- 15-min Quick Demo
-- 30-min Strategy Session
-- 60-min Deep Dive
-
-<b>Available</b>: Monday-Friday, 9 AM - 6 PM EST
-
-What works best for your schedule?"""
-            
-        else:  # general
-            return """<b>Welcome to Revenue Copilot!</b>
-
-<b>I'm here to help you</b>:
-• Boost your revenue
-• Get powerful insights
-• Capture more leads
-• Scale your business
-
-<b>Try asking me about</b>:
-- Pricing and features
-- Free demo or trial
-- Refund policy
-- Support options
-
-How can I help you today?"""
+            # First topic in knowledge base order wins, default knowledge response otherwise
+            reply = next(
+                (self.knowledge_replies[keyword] for keyword in self.knowledge_base if keyword in found),
+                KNOWLEDGE_FALLBACK
+            )
+            if len(self.response_cache) < RESPONSE_CACHE_SIZE:
+                self.response_cache[query] = reply
+            return reply
+        
+        return INTENT_REPLIES.get(intent, GENERAL_REPLY)
     
     def process_message(self, message: Dict):
         """Process message with performance tracking"""
@@ -220,12 +282,15 @@ How can I help you today?"""
             
             logger.info(f"Message from @{username}: {text}")
             
+            # Lowercase once - shared by classification and knowledge lookup
+            text_lower = text.lower()
+            
             # Fast intent classification
-            intent, confidence = self.classify_intent(text)
+            intent, confidence = classify_text(text_lower)
             logger.info(f"Intent: {intent} (confidence: {confidence:.1f})")
             
             # Generate response
-            response = self.generate_response(text, intent)
+            response = self.generate_response(text, intent, text_lower)
             
             # Send response
             success = self.send_message(chat_id, response)
@@ -291,7 +356,12 @@ How can I help you today?"""
         
         try:
             while self.running:
+                # Long poll - Telegram holds the request open, so no extra sleep between polls
                 updates = self.get_updates(offset, timeout=1)
+                if updates is None:
+                    # API unreachable - back off instead of spinning on instant failures
+                    time.sleep(1)
+                    continue
                 
                 if updates:
                     logger.info(f"Received {len(updates)} update(s)")
@@ -303,8 +373,6 @@ How can I help you today?"""
                         
                         offset = update['update_id'] + 1
                 
-                time.sleep(0.1)
-                
         except KeyboardInterrupt:
             logger.info("Stopping production bot...")
         except Exception as e:
@@ -312,6 +380,7 @@ How can I help you today?"""
         finally:
             self.running = False
             self.executor.shutdown(wait=True)
+            self.session.close()
             self.log_performance()
             logger.info("Production bot stopped")
 
@@ -320,6 +389,15 @@ def signal_handler(signum, frame):
     logger.info("Received shutdown signal")
     sys.exit(0)
 
+STARTUP_BANNER = "\n".join([
+    "PRODUCTION TELEGRAM REVENUE COPILOT",
+    "=" * 50,
+    "Ultra-fast bot with performance monitoring",
+    "Bot: @Renvuee_Bot",
+    "Press Ctrl+C to stop",
+    "=" * 50
+])
+
 def main():
     """Main function"""
     
@@ -330,12 +408,7 @@ def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
-    print("PRODUCTION TELEGRAM REVENUE COPILOT")
-    print("=" * 50)
-    print("Ultra-fast bot with performance monitoring")
-    print("Bot: @Renvuee_Bot")
-    print("Press Ctrl+C to stop")
-    print("=" * 50)
+    print(STARTUP_BANNER)
     
     # Create and run bot
     bot = ProductionTelegramBot(TOKEN)
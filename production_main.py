@@ -46,6 +46,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+READY_BANNER = "\n".join([
+    "",
+    "=" * 60,
+    "🤖 BOT STATUS: ONLINE ✅",
+    "📱 Telegram: @Renvuee_Bot",
+    "💬 Ready to capture leads and generate revenue!",
+    "📊 Performance monitoring active",
+    "=" * 60,
+    ""
+])
+
 
 class ProductionLauncher:
     """
@@ -144,14 +155,14 @@ class ProductionLauncher:
 ║                                                              ║
 ╚══════════════════════════════════════════════════════════════╝
 """
-        print(banner)
-        
-        # System info
-        print(f"🐍 Python: {sys.version.split()[0]}")
-        print(f"💻 Platform: {sys.platform}")
-        print(f"📂 Working Directory: {os.getcwd()}")
-        print(f"⏰ Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print()
+        # Banner and system info in one write
+        print(
+            f"{banner}\n"
+            f"🐍 Python: {sys.version.split()[0]}\n"
+            f"💻 Platform: {sys.platform}\n"
+            f"📂 Working Directory: {os.getcwd()}\n"
+            f"⏰ Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        )
     
     def run_bot(self):
         """Run the bot with error recovery"""
@@ -209,12 +220,7 @@ class ProductionLauncher:
         
         # Print ready message
         logger.info("🎉 ALL SYSTEMS GO! Ultimate Revenue Copilot is LIVE!")
-        print("\n" + "="*60)
-        print("🤖 BOT STATUS: ONLINE ✅")
-        print("📱 Telegram: @Renvuee_Bot")
-        print("💬 Ready to capture leads and generate revenue!")
-        print("📊 Performance monitoring active")
-        print("="*60 + "\n")
+        print(READY_BANNER)
         
         try:
             # Run the bot
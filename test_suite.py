@@ -9,16 +9,13 @@ Tests all scenarios, edge cases, and performance metrics
 import unittest
 import json
 import time
+import threading
 import logging
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
 import sys
-import os
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
-from ultimate_bot import UltimateTelegramBot, UserSession, BotMetrics
+from ultimate_bot import UltimateTelegramBot, UserSession, BotMetrics, SendRateLimiter
 
 # Configure test logging
 logging.basicConfig(level=logging.INFO)
@@ -106,10 +103,12 @@ class TestUltimateTelegramBot(unittest.TestCase):
         ]
         
         for text, expected_intent in test_cases:
-            intent, confidence, patterns = self.bot.classify_intent_advanced(text, session)
-            self.assertEqual(intent, expected_intent, f"Failed for text: '{text}'")
-            self.assertGreaterEqual(confidence, 0.0)
-            self.assertLessEqual(confidence, 1.0)
+            # Each phrase reports on its own instead of the first mismatch hiding the rest
+            with self.subTest(text=text):
+                intent, confidence, patterns = self.bot.classify_intent_advanced(text, session)
+                self.assertEqual(intent, expected_intent, f"Failed for text: '{text}'")
+                self.assertGreaterEqual(confidence, 0.0)
+                self.assertLessEqual(confidence, 1.0)
         
         logger.info("✅ Intent classification test passed")
     
@@ -282,8 +281,6 @@ class TestUltimateTelegramBot(unittest.TestCase):
         self.assertLess(response_time, 0.1, "Response generation too slow")
         
         # Test concurrent processing capability
-        import threading
-        
         def test_concurrent_processing():
             session = UserSession(chat_id=12345, username='testuser')
             response, keyboard = self.bot.generate_smart_response(
@@ -345,6 +342,31 @@ class TestUltimateTelegramBot(unittest.TestCase):
         self.assertIn("month", pricing_content)  # Has subscription terms
         
         logger.info("✅ Knowledge base accuracy test passed")
+    
+    def test_13_send_rate_limiting(self):
+        """Test outbound sends are throttled by the token bucket"""
+        logger.info("Testing send rate limiting...")
+        
+        limiter = SendRateLimiter(rate=20, burst=2)
+        
+        # Burst is served immediately
+        start_time = time.monotonic()
+        limiter.acquire()
+        limiter.acquire()
+        self.assertLess(time.monotonic() - start_time, 0.04)
+        
+        # Next send waits for a token to refill (1/20s)
+        start_time = time.monotonic()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start_time, 0.04)
+        
+        # Every send goes through the bot's limiter
+        with patch.object(self.bot.send_limiter, 'acquire') as mock_acquire, \
+             patch.object(self.bot, 'make_request', return_value={"ok": True}):
+            self.assertTrue(self.bot.send_message(12345, "test message"))
+            mock_acquire.assert_called_once()
+        
+        logger.info("✅ Send rate limiting test passed")
 
 class TestIntegration(unittest.TestCase):
     """Integration tests for complete bot functionality"""
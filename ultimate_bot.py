@@ -8,9 +8,6 @@ Features: Smart greetings, interactive menus, intelligent responses
 
 import json
 import time
-import urllib.request
-import urllib.parse
-import urllib.error
 import logging
 import signal
 import sys
@@ -21,6 +18,16 @@ import threading
 from concurrent.futures import ThreadPoolExecutor
 import re
 
+import requests
+from requests.adapters import HTTPAdapter
+
+# Optional: orjson decodes Bot API replies several times faster than stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -32,6 +39,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Intent patterns - compiled once at import instead of looked up in re's cache on every message
+INTENT_PATTERNS = {
+    intent: [re.compile(pattern) for pattern in patterns]
+    for intent, patterns in {
+        'greeting': [r'\b(hi|hello|hey|start|good\s+(morning|afternoon|evening))\b'],
+        'demo_request': [r'\b(demo|demonstration|show|see\s+platform|trial)\b'],
+        'pricing_inquiry': [r'\b(price|pricing|cost|how\s+much|plans|subscription)\b'],
+        'feature_question': [r'\b(features|capabilities|what\s+can|functionality)\b'],
+        'support_request': [r'\b(help|support|problem|issue|trouble)\b'],
+        'lead_info': [r'\b(contact|email|phone|reach|business|company)\b'],
+        'refund_inquiry': [r'\b(refund|money\s+back|return|cancel|guarantee)\b'],
+        'booking': [r'\b(book|schedule|appointment|meeting|call)\b']
+    }.items()
+}
+
+# Follow-up words that confirm a pending demo offer - matched as whole words
+WORD_RE = re.compile(r'\w+')
+DEMO_CONFIRM_WORDS = frozenset({"yes", "sure", "interested", "book"})
+
+# Knowledge-backed intents: knowledge base entry and follow-up keyboard options
+KNOWLEDGE_INTENTS = {
+    'pricing_inquiry': ("pricing", [
+        "🎯 Book Free Demo",
+        "📊 Get Custom Quote",
+        "💬 Chat with Sales",
+        "🔙 Back to Main Menu"
+    ]),
+    'feature_question': ("features", [
+        "🎬 See Demo",
+        "💰 View Pricing",
+        "📞 Schedule Call",
+        "🔙 Back to Main Menu"
+    ]),
+    'support_request': ("support", [
+        "💬 Start Live Chat",
+        "📧 Email Support",
+        "📚 Knowledge Base",
+        "🔙 Back to Main Menu"
+    ]),
+    'refund_inquiry': ("refund", [
+        "📧 Request Refund",
+        "💬 Chat with Support",
+        "🔙 Back to Main Menu"
+    ])
+}
+
 @dataclass
 class UserSession:
     """Track user session state"""
@@ -66,6 +119,32 @@ class BotMetrics:
         if self.uptime_start is None:
             self.uptime_start = datetime.now()
 
+# Telegram rejects bots that send more than ~30 messages per second across all chats
+TELEGRAM_SEND_RATE = 30
+
+class SendRateLimiter:
+    """Thread-safe token bucket shared by all send workers"""
+    
+    def __init__(self, rate: float = TELEGRAM_SEND_RATE, burst: int = TELEGRAM_SEND_RATE):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a send slot is free - waits instead of collecting 429s"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
 class UltimateTelegramBot:
     """The ULTIMATE smart Telegram bot with interactive features"""
     
@@ -78,6 +157,11 @@ class UltimateTelegramBot:
         self.response_cache = {}
         self.executor = ThreadPoolExecutor(max_workers=15)
         
+        # Keep-alive session sized to the worker pool: replies reuse open TLS connections
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=15))
+        self.send_limiter = SendRateLimiter()
+        
         # Smart menu system
         self.menus = {
             "main": {
@@ -239,6 +323,12 @@ No cancellation fees
             ]
         }
         
+        # Pre-rendered knowledge replies - content and keyboards never change per message
+        self.knowledge_replies = {
+            intent: (self.knowledge_base[key]["content"], self.create_keyboard(options))
+            for intent, (key, options) in KNOWLEDGE_INTENTS.items()
+        }
+        
         logger.info("🤖 Ultimate Telegram Bot initialized with enhanced features")
     
     def make_request(self, method: str, data: Dict = None, timeout: int = 10) -> Optional[Dict]:
@@ -247,18 +337,17 @@ No cancellation fees
             url = f"{self.base_url}/{method}"
             
             if data:
-                data = urllib.parse.urlencode(data).encode('utf-8')
-            
-            req = urllib.request.Request(url, data=data)
-            req.add_header('Content-Type', 'application/x-www-form-urlencoded')
-            
-            with urllib.request.urlopen(req, timeout=timeout) as response:
-                result = json.loads(response.read().decode('utf-8'))
-                return result
+                response = self.session.post(url, data=data, timeout=timeout)
+            else:
+                response = self.session.get(url, timeout=timeout)
+            response.raise_for_status()
+            if ORJSON_AVAILABLE:
+                return orjson.loads(response.content)
+            return response.json()
                 
-        except urllib.error.HTTPError as e:
-            if e.code != 409:  # Ignore conflict errors (multiple bot instances)
-                logger.error(f"HTTP Error {e.code}: {e.reason}")
+        except requests.HTTPError as e:
+            if e.response.status_code != 409:  # Ignore conflict errors (multiple bot instances)
+                logger.error(f"HTTP Error {e.response.status_code}: {e.response.reason}")
                 self.metrics.errors += 1
             return None
         except Exception as e:
@@ -270,14 +359,14 @@ No cancellation fees
         """Get bot information"""
         return self.make_request("getMe")
     
-    def get_updates(self, offset: int = 0, timeout: int = 1) -> List[Dict]:
-        """Get updates with smart polling"""
+    def get_updates(self, offset: int = 0, timeout: int = 1) -> Optional[List[Dict]]:
+        """Get updates with smart polling (None if the API call failed)"""
         data = {"offset": offset, "timeout": timeout, "limit": 100}
         result = self.make_request("getUpdates", data, timeout=timeout+3)
         
         if result and result.get("ok"):
             return result.get("result", [])
-        return []
+        return None
     
     def send_message(self, chat_id: int, text: str, reply_markup: Dict = None) -> bool:
         """Send enhanced message with optional keyboard"""
@@ -289,8 +378,12 @@ No cancellation fees
         }
         
         if reply_markup:
-            data["reply_markup"] = json.dumps(reply_markup)
+            if ORJSON_AVAILABLE:
+                data["reply_markup"] = orjson.dumps(reply_markup).decode('utf-8')
+            else:
+                data["reply_markup"] = json.dumps(reply_markup)
         
+        self.send_limiter.acquire()
         result = self.make_request("sendMessage", data, timeout=5)
         
         if result and result.get("ok"):
@@ -302,7 +395,12 @@ No cancellation fees
             return False
     
     def create_keyboard(self, options: List[str], columns: int = 2) -> Dict:
-        """Create inline keyboard from options"""
+        """Create inline keyboard from options (memoized - menus are static)"""
+        cache_key = (tuple(options), columns)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         keyboard = []
         for i in range(0, len(options), columns):
             row = []
@@ -316,7 +414,9 @@ No cancellation fees
                     })
             keyboard.append(row)
         
-        return {"inline_keyboard": keyboard}
+        markup = {"inline_keyboard": keyboard}
+        self.response_cache[cache_key] = markup
+        return markup
     
     def get_user_session(self, message: Dict) -> UserSession:
         """Get or create user session"""
@@ -337,24 +437,12 @@ No cancellation fees
         """Advanced intent classification with context"""
         text_lower = text.lower()
         
-        # Check for specific patterns
-        patterns = {
-            'greeting': [r'\b(hi|hello|hey|start|good\s+(morning|afternoon|evening))\b'],
-            'demo_request': [r'\b(demo|demonstration|show|see\s+platform|trial)\b'],
-            'pricing_inquiry': [r'\b(price|pricing|cost|how\s+much|plans|subscription)\b'],
-            'feature_question': [r'\b(features|capabilities|what\s+can|functionality)\b'],
-            'support_request': [r'\b(help|support|problem|issue|trouble)\b'],
-            'lead_info': [r'\b(contact|email|phone|reach|business|company)\b'],
-            'refund_inquiry': [r'\b(refund|money\s+back|return|cancel|guarantee)\b'],
-            'booking': [r'\b(book|schedule|appointment|meeting|call)\b']
-        }
-        
         intent_scores = {}
         matched_patterns = {}
         
-        for intent, regex_list in patterns.items():
+        for intent, regex_list in INTENT_PATTERNS.items():
             for pattern in regex_list:
-                matches = re.findall(pattern, text_lower)
+                matches = pattern.findall(text_lower)
                 if matches:
                     score = len(matches) * 0.3
                     intent_scores[intent] = intent_scores.get(intent, 0) + score
@@ -362,7 +450,7 @@ No cancellation fees
         
         # Context-aware scoring
         if session.conversation_context:
-            if "demo" in session.conversation_context and any(word in text_lower for word in ["yes", "sure", "interested", "book"]):
+            if "demo" in session.conversation_context and not DEMO_CONFIRM_WORDS.isdisjoint(WORD_RE.findall(text_lower)):
                 intent_scores["demo_request"] = intent_scores.get("demo_request", 0) + 0.5
         
         if intent_scores:
@@ -378,6 +466,10 @@ No cancellation fees
         # Update conversation context
         session.conversation_context = intent
         
+        knowledge_reply = self.knowledge_replies.get(intent)
+        if knowledge_reply is not None:
+            return knowledge_reply
+        
         if intent == 'greeting':
             menu = self.menus["main"]
             response = f"""<b>{menu['title']}</b>
@@ -407,53 +499,6 @@ Choose an option below or ask me anything!"""
             keyboard = self.create_keyboard(menu['options'])
             return response, keyboard
             
-        elif intent == 'pricing_inquiry':
-            knowledge = self.knowledge_base["pricing"]
-            response = knowledge["content"]
-            
-            keyboard = self.create_keyboard([
-                "🎯 Book Free Demo",
-                "📊 Get Custom Quote", 
-                "💬 Chat with Sales",
-                "🔙 Back to Main Menu"
-            ])
-            return response, keyboard
-            
-        elif intent == 'feature_question':
-            knowledge = self.knowledge_base["features"]
-            response = knowledge["content"]
-            
-            keyboard = self.create_keyboard([
-                "🎬 See Demo",
-                "💰 View Pricing",
-                "📞 Schedule Call",
-                "🔙 Back to Main Menu"
-            ])
-            return response, keyboard
-            
-        elif intent == 'support_request':
-            knowledge = self.knowledge_base["support"]
-            response = knowledge["content"]
-            
-            keyboard = self.create_keyboard([
-                "💬 Start Live Chat",
-                "📧 Email Support",
-                "📚 Knowledge Base",
-                "🔙 Back to Main Menu"
-            ])
-            return response, keyboard
-            
-        elif intent == 'refund_inquiry':
-            knowledge = self.knowledge_base["refund"]
-            response = knowledge["content"]
-            
-            keyboard = self.create_keyboard([
-                "📧 Request Refund",
-                "💬 Chat with Support",
-                "🔙 Back to Main Menu"
-            ])
-            return response, keyboard
-            
         elif intent == 'lead_info':
             session.conversation_context = "lead_capture"
             response = """<b>🎯 INTERESTED IN BOOSTING YOUR REVENUE?</b>
@@ -700,7 +745,12 @@ I can assist you with:
         
         try:
             while self.running:
+                # Long poll - Telegram holds the request open, so no extra sleep between polls
                 updates = self.get_updates(offset, timeout=1)
+                if updates is None:
+                    # API unreachable - back off instead of spinning on instant failures
+                    time.sleep(1)
+                    continue
                 
                 if updates:
                     logger.info(f"📨 Processing {len(updates)} update(s)")
@@ -716,8 +766,6 @@ I can assist you with:
                         
                         offset = update['update_id'] + 1
                 
-                time.sleep(0.1)
-                
         except KeyboardInterrupt:
             logger.info("🛑 Stopping Ultimate Bot...")
         except Exception as e:
@@ -725,6 +773,7 @@ I can assist you with:
         finally:
             self.running = False
             self.executor.shutdown(wait=True)
+            self.session.close()
             self.log_performance_enhanced()
             logger.info("👋 Ultimate Bot stopped")
 
@@ -733,6 +782,21 @@ def signal_handler(signum, frame):
     logger.info("🛑 Received shutdown signal")
     sys.exit(0)
 
+STARTUP_BANNER = "\n".join([
+    "🤖 ULTIMATE TELEGRAM REVENUE COPILOT",
+    "=" * 60,
+    "🚀 Smart AI bot with interactive menus",
+    "💬 Context-aware conversations",
+    "🎯 Advanced lead capture",
+    "📊 Real-time performance metrics",
+    "🎬 Interactive demo booking",
+    "💰 Smart pricing presentation",
+    "",
+    "Bot: @Renvuee_Bot",
+    "Press Ctrl+C to stop",
+    "=" * 60
+])
+
 def main():
     """Main function to run the ultimate bot"""
     
@@ -743,18 +807,7 @@ def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
-    print("🤖 ULTIMATE TELEGRAM REVENUE COPILOT")
-    print("=" * 60)
-    print("🚀 Smart AI bot with interactive menus")
-    print("💬 Context-aware conversations")
-    print("🎯 Advanced lead capture")
-    print("📊 Real-time performance metrics")
-    print("🎬 Interactive demo booking")
-    print("💰 Smart pricing presentation")
-    print("")
-    print("Bot: @Renvuee_Bot")
-    print("Press Ctrl+C to stop")
-    print("=" * 60)
+    print(STARTUP_BANNER)
     
     # Create and run ultimate bot
     bot = UltimateTelegramBot(TOKEN)
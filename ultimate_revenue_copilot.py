@@ -70,6 +70,54 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 🎯 Intent patterns - compiled once at import instead of per message
+INTENT_PATTERNS = {
+    intent: tuple(re.compile(pattern) for pattern in patterns)
+    for intent, patterns in {
+        'knowledge_qa': (
+            r'\b(what|how|when|where|why|tell me|explain|question)\b',
+            r'\b(policy|procedure|guideline|documentation)\b',
+            r'\b(refund|return|support|help)\b'
+        ),
+        'lead_capture': (
+            r'\b(\w+)\s+from\s+(\w+)\s+(wants|needs|interested)\b',
+            r'\b(budget|pricing|cost|quote)\b.*\$?\d+',
+            r'\b(demo|meeting|call|discussion)\b'
+        ),
+        'proposal_request': (
+            r'\b(proposal|quote|estimate|draft)\b',
+            r'\b(create|generate|make|write)\b.*\b(proposal|quote)\b'
+        ),
+        'next_step': (
+            r'\b(schedule|book|set up|arrange)\b.*\b(meeting|call|demo)\b',
+            r'\b(next|tomorrow|monday|tuesday|wednesday|thursday|friday)\b',
+            r'\b(\d{1,2}:\d{2}|am|pm)\b'
+        ),
+        'status_update': (
+            r'\b(won|lost|closed|cancelled|on hold)\b',
+            r'\b(update|status|progress)\b',
+            r'\b(budget cut|approved|rejected)\b'
+        )
+    }.items()
+}
+
+# 🔍 Entity extractors
+NAME_FROM_COMPANY_RE = re.compile(r'\b([A-Z][a-z]+)\s+from\s+([A-Z][a-z]+)')
+BUDGET_RE = re.compile(r'\$?([\d,]+k?)')
+TIME_RE = re.compile(r'\b(\d{1,2}):?(\d{2})?\s*(am|pm)?\b')
+DAY_RE = re.compile(r'\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday|tomorrow|today)\b')
+LEAD_NAME_COMPANY_RE = re.compile(r'\b([A-Z][a-z]+)\s+from\s+([A-Z][a-z]+|\w+\s+\w+)')
+ATTENDEE_RE = re.compile(r'\bwith\s+([A-Z][a-z]+)')
+NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9]')
+WORD_RE = re.compile(r'\w+')
+
+# 📈 Deal status keywords - matched as whole words
+STATUS_WORDS = (
+    ("Won", frozenset({'won', 'closed', 'signed'})),
+    ("Lost", frozenset({'lost', 'cancelled', 'rejected'})),
+    ("On Hold", frozenset({'hold', 'delayed', 'postponed'}))
+)
+
 # Data Models
 @dataclass
 class IntentClassification:
@@ -487,16 +535,18 @@ Let's grow your revenue together! 🚀"""
     
     async def send_knowledge_response(self, update: Update, response: KnowledgeResponse):
         """Send knowledge response with citations"""
-        text = f"📚 **Knowledge Response**\n\n{response.answer}"
+        lines = [f"📚 **Knowledge Response**\n\n{response.answer}"]
         
         if response.citations:
-            text += "\n\n📎 **Sources:**"
+            lines.append("\n📎 **Sources:**")
             for i, citation in enumerate(response.citations, 1):
-                text += f"\n{i}. {citation.title}"
                 if citation.page_ranges:
-                    text += f" (pages: {', '.join(citation.page_ranges)})"
+                    lines.append(f"{i}. {citation.title} (pages: {', '.join(citation.page_ranges)})")
+                else:
+                    lines.append(f"{i}. {citation.title}")
         
-        text += f"\n\n🎯 Confidence: {response.confidence:.1%}"
+        lines.append(f"\n🎯 Confidence: {response.confidence:.1%}")
+        text = "\n".join(lines)
         
         # Add follow-up options
         keyboard = [
@@ -533,18 +583,16 @@ Our team will contact you within 2 hours!"""
     
     async def send_proposal_response(self, update: Update, proposal: ProposalContent):
         """Send proposal generation response"""
-        text = f"""📊 **Proposal Generated Successfully!**
+        lines = [f"""📊 **Proposal Generated Successfully!**
 
 **{proposal.title}**
 
 {proposal.summary_blurb}
 
-**Key Benefits:**"""
-        
-        for bullet in proposal.bullet_points:
-            text += f"\n• {bullet}"
-        
-        text += "\n\n🔗 **Full proposal document will be shared via Drive link**"
+**Key Benefits:**"""]
+        lines.extend(f"• {bullet}" for bullet in proposal.bullet_points)
+        lines.append("\n🔗 **Full proposal document will be shared via Drive link**")
+        text = "\n".join(lines)
         
         keyboard = [
             [InlineKeyboardButton("📄 View Full Proposal", callback_data=f"view_proposal_{proposal.request_id}")],
@@ -683,7 +731,8 @@ Calendar invite will be sent to all attendees."""
     def run(self):
         """Start the bot"""
         logger.info("🚀 Starting Ultimate Telegram Revenue Copilot...")
-        self.app.run_polling(poll_interval=1)
+        # Long polling already waits server-side; a poll_interval would only delay the next batch
+        self.app.run_polling(poll_interval=0.0)
 
 
 class IntentClassifier:
@@ -693,32 +742,7 @@ class IntentClassifier:
         self.bot = bot
         
         # Intent patterns (would use LangChain in production)
-        self.patterns = {
-            'knowledge_qa': [
-                r'\b(what|how|when|where|why|tell me|explain|question)\b',
-                r'\b(policy|procedure|guideline|documentation)\b',
-                r'\b(refund|return|support|help)\b'
-            ],
-            'lead_capture': [
-                r'\b(\w+)\s+from\s+(\w+)\s+(wants|needs|interested)\b',
-                r'\b(budget|pricing|cost|quote)\b.*\$?\d+',
-                r'\b(demo|meeting|call|discussion)\b'
-            ],
-            'proposal_request': [
-                r'\b(proposal|quote|estimate|draft)\b',
-                r'\b(create|generate|make|write)\b.*\b(proposal|quote)\b'
-            ],
-            'next_step': [
-                r'\b(schedule|book|set up|arrange)\b.*\b(meeting|call|demo)\b',
-                r'\b(next|tomorrow|monday|tuesday|wednesday|thursday|friday)\b',
-                r'\b(\d{1,2}:\d{2}|am|pm)\b'
-            ],
-            'status_update': [
-                r'\b(won|lost|closed|cancelled|on hold)\b',
-                r'\b(update|status|progress)\b',
-                r'\b(budget cut|approved|rejected)\b'
-            ]
-        }
+        self.patterns = INTENT_PATTERNS
     
     async def classify(self, text: str, context: List[Dict]) -> IntentClassification:
         """Classify user intent from natural language"""
@@ -731,7 +755,7 @@ class IntentClassifier:
         for intent, patterns in self.patterns.items():
             score = 0
             for pattern in patterns:
-                matches = re.findall(pattern, text_lower)
+                matches = pattern.findall(text_lower)
                 if matches:
                     score += len(matches) * 0.3
                     
@@ -768,13 +792,13 @@ class IntentClassifier:
         entities = {}
         
         # Extract names and companies
-        name_match = re.search(r'\b([A-Z][a-z]+)\s+from\s+([A-Z][a-z]+)', text)
+        name_match = NAME_FROM_COMPANY_RE.search(text)
         if name_match:
             entities['name'] = name_match.group(1)
             entities['company'] = name_match.group(2)
         
         # Extract budget
-        budget_match = re.search(r'\$?([\d,]+k?)', text)
+        budget_match = BUDGET_RE.search(text)
         if budget_match:
             entities['budget'] = budget_match.group(1)
         
@@ -783,14 +807,15 @@ class IntentClassifier:
     def extract_schedule_entities(self, text: str) -> Dict[str, Any]:
         """Extract scheduling information from text"""
         entities = {}
+        text_lower = text.lower()
         
         # Extract time
-        time_match = re.search(r'\b(\d{1,2}):?(\d{2})?\s*(am|pm)?\b', text.lower())
+        time_match = TIME_RE.search(text_lower)
         if time_match:
             entities['time'] = time_match.group(0)
         
         # Extract day
-        day_match = re.search(r'\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday|tomorrow|today)\b', text.lower())
+        day_match = DAY_RE.search(text_lower)
         if day_match:
             entities['day'] = day_match.group(1)
         
@@ -977,23 +1002,24 @@ class DealflowAgent:
         lead_data = {}
         
         # Extract name and company
-        name_company_match = re.search(r'\b([A-Z][a-z]+)\s+from\s+([A-Z][a-z]+|\w+\s+\w+)', text)
+        name_company_match = LEAD_NAME_COMPANY_RE.search(text)
         if name_company_match:
             lead_data['name'] = name_company_match.group(1)
             lead_data['company'] = name_company_match.group(2)
         
         # Extract intent
-        if 'demo' in text.lower():
+        text_lower = text.lower()
+        if 'demo' in text_lower:
             lead_data['intent'] = 'Demo Request'
-        elif 'poc' in text.lower():
+        elif 'poc' in text_lower:
             lead_data['intent'] = 'PoC Request'
-        elif 'proposal' in text.lower():
+        elif 'proposal' in text_lower:
             lead_data['intent'] = 'Proposal Request'
         else:
             lead_data['intent'] = 'General Inquiry'
         
         # Extract budget
-        budget_match = re.search(r'\$?([\d,]+k?)', text)
+        budget_match = BUDGET_RE.search(text)
         if budget_match:
             lead_data['budget'] = f"${budget_match.group(1)}"
         
@@ -1020,7 +1046,7 @@ class DealflowAgent:
             return None
         
         # Simple domain guessing logic
-        clean_name = re.sub(r'[^a-zA-Z0-9]', '', company.lower())
+        clean_name = NON_ALNUM_RE.sub('', company.lower())
         return f"{clean_name}.com"
     
     async def save_lead_to_crm(self, lead: Lead):
@@ -1087,15 +1113,16 @@ class DealflowAgent:
         """Parse scheduling information from natural language"""
         # Extract time and date information
         title = "Business Meeting"
+        text_lower = text.lower()
         
         # Parse time
-        time_match = re.search(r'\b(\d{1,2}):?(\d{2})?\s*(am|pm)?\b', text.lower())
+        time_match = TIME_RE.search(text_lower)
         start_time = "10:00"
         if time_match:
             start_time = time_match.group(0)
         
         # Parse day
-        day_match = re.search(r'\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday|tomorrow|today)\b', text.lower())
+        day_match = DAY_RE.search(text_lower)
         date_str = "tomorrow"
         if day_match:
             date_str = day_match.group(1)
@@ -1111,7 +1138,7 @@ class DealflowAgent:
         
         # Extract attendees
         attendees = []
-        name_matches = re.findall(r'\bwith\s+([A-Z][a-z]+)', text)
+        name_matches = ATTENDEE_RE.findall(text)
         if name_matches:
             attendees = name_matches
             title = f"Meeting with {', '.join(attendees)}"
@@ -1128,13 +1155,12 @@ class DealflowAgent:
         # Parse status from text
         status = "Unknown"
         reason = text
+        words = set(WORD_RE.findall(text.lower()))
         
-        if any(word in text.lower() for word in ['won', 'closed', 'signed']):
-            status = "Won"
-        elif any(word in text.lower() for word in ['lost', 'cancelled', 'rejected']):
-            status = "Lost"
-        elif any(word in text.lower() for word in ['hold', 'delayed', 'postponed']):
-            status = "On Hold"
+        for label, keywords in STATUS_WORDS:
+            if not keywords.isdisjoint(words):
+                status = label
+                break
         
         # Would update CRM in production
         logger.info(f"Status update: {status} - {reason}")
@@ -65,23 +65,34 @@ class TestUltimateTelegramRevenueCopilot(unittest.TestCase):
         
         if not BOT_AVAILABLE:
             cls.skipTest(cls, "Bot classes not available")
+        
+        # Mock bot token
+        os.environ['TELEGRAM_BOT_TOKEN'] = 'test_token_123'
+        
+        # Build the bot once - patching Application and constructing stores/handlers per test is the slow part
+        with patch('ultimate_revenue_copilot.Application') as mock_app:
+            mock_app.builder.return_value.token.return_value.build.return_value = Mock()
+            cls.bot = UltimateTelegramRevenueCopilot('test_token')
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Release the shared bot's worker threads"""
+        if BOT_AVAILABLE:
+            cls.bot.executor.shutdown(wait=True)
     
     def setUp(self):
         """Setup for each test"""
         self.test_results['total_tests'] += 1
         
-        # Mock bot token
-        os.environ['TELEGRAM_BOT_TOKEN'] = 'test_token_123'
-        
         # Create temporary database
         self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
         
-        # Mock the bot initialization to avoid real Telegram connection
-        with patch('ultimate_revenue_copilot.Application') as mock_app:
-            mock_app.builder.return_value.token.return_value.build.return_value = Mock()
-            self.bot = UltimateTelegramRevenueCopilot('test_token')
-            self.bot.db_path = self.temp_db.name
-            self.bot.setup_database()
+        # Reset per-test state on the shared bot
+        self.bot.setup_agents()
+        self.bot.metrics = dict.fromkeys(self.bot.metrics, 0)
+        self.bot.user_sessions = {}
+        self.bot.db_path = self.temp_db.name
+        self.bot.setup_database()
     
     def tearDown(self):
         """Cleanup after each test"""